@@ -0,0 +1,148 @@
+import multiprocessing
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+import degrees
+
+USAGE = "Usage: python analytics.py [directory] [--samples=N] [--workers=N] [--seed=N]"
+
+# Width of the longest bar of the histograms
+BAR_WIDTH = 50
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    options = dict(arg[2:].partition("=")[::2] for arg in sys.argv[1:] if arg.startswith("--"))
+    if len(args) > 1 or any(option not in ("samples", "workers", "seed") for option in options):
+        sys.exit(USAGE)
+    directory = args[0] if len(args) == 1 else "large"
+    try:
+        samples = int(options["samples"]) if "samples" in options else None
+        workers = int(options.get("workers", os.cpu_count()))
+        seed = int(options["seed"]) if "seed" in options else None
+    except ValueError:
+        sys.exit(USAGE)
+
+    print("Loading data...")
+    degrees.load_data(directory, snapshot=True)
+    print("Data loaded.")
+    graph = degrees.graph
+
+    start = time.perf_counter()
+    sizes = component_sizes(graph)
+    print(f"\nConnected components ({len(sizes)}, computed in {time.perf_counter() - start:.2f}s)")
+    print(f"    largest: {max(sizes, default=0)} people")
+    print("    sizes (rounded down to a power of 2):")
+    print_histogram(Counter(size_bucket(size) for size in sizes), "components")
+
+    # All the people are swept if no sample size is given
+    sources = list(range(graph.person_count()))
+    if samples is not None and samples < len(sources):
+        sources = random.Random(seed).sample(sources, samples)
+
+    start = time.perf_counter()
+    stats = sweep(directory, sources, workers)
+    elapsed = time.perf_counter() - start
+    print(f"\nSeparation degrees ({len(sources)} sources, {workers} workers, {elapsed:.2f}s)")
+    print(f"    not connected pairs: {stats['unreachable']}")
+    print_histogram(stats["histogram"], "pairs")
+
+    print("\nEccentricity of the sources")
+    print_histogram(stats["eccentricities"], "sources")
+    # The eccentricity of any person is a lower bound of the diameter
+    print(f"    approximate diameter: {max(stats['eccentricities'], default=0)} (lower bound)")
+
+
+def component_sizes(graph):
+    """
+    Returns the list of the sizes of the connected components of the graph.
+    """
+    person_offsets, person_movies = graph.person_offsets, graph.person_movies
+    movie_offsets, movie_people = graph.movie_offsets, graph.movie_people
+
+    # Shared by all the searches, so that each person and movie is visited once overall
+    person_seen = bytearray(graph.person_count())
+    movie_seen = bytearray(len(graph.movie_ids))
+    sizes = []
+    for root in range(graph.person_count()):
+        if person_seen[root]:
+            continue
+        person_seen[root] = 1
+        stack = [root]
+        size = 0
+        while stack:
+            person = stack.pop()
+            size += 1
+            for k in range(person_offsets[person], person_offsets[person + 1]):
+                movie = person_movies[k]
+                if movie_seen[movie]:
+                    continue
+                movie_seen[movie] = 1
+                for h in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                    neighbor = movie_people[h]
+                    if not person_seen[neighbor]:
+                        person_seen[neighbor] = 1
+                        stack.append(neighbor)
+        sizes.append(size)
+    return sizes
+
+
+def sweep(directory, sources, workers):
+    """
+    Runs a full BFS from each of the sources on a pool of workers.
+    Returns the merged histograms of the distances and of the eccentricities,
+    and the number of not connected (source, person) pairs.
+    """
+    chunk_size = max(1, len(sources) // (workers * 4))
+    chunks = [sources[i:i + chunk_size] for i in range(0, len(sources), chunk_size)]
+
+    stats = {"histogram": Counter(), "eccentricities": Counter(), "unreachable": 0}
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(directory,)) as pool:
+        for partial in pool.imap_unordered(_sweep_chunk, chunks):
+            stats["histogram"].update(partial["histogram"])
+            stats["eccentricities"].update(partial["eccentricities"])
+            stats["unreachable"] += partial["unreachable"]
+    return stats
+
+
+def _init_worker(directory):
+    degrees.load_data(directory, snapshot=True)
+
+
+def _sweep_chunk(sources):
+    """
+    Sweeps a chunk of sources inside a worker process.
+    """
+    stats = {"histogram": Counter(), "eccentricities": Counter(), "unreachable": 0}
+    for source in sources:
+        distances = Counter(degrees.graph.distances(source))
+        stats["unreachable"] += distances.pop(-1, 0)
+        distances.pop(0)
+        stats["histogram"].update(distances)
+        stats["eccentricities"][max(distances, default=0)] += 1
+    return stats
+
+
+def size_bucket(size):
+    """
+    Returns the power of 2 bucket of a component size.
+    """
+    return 1 << (size.bit_length() - 1)
+
+
+def print_histogram(histogram, unit):
+    """
+    Prints a histogram as bars proportional to the counts.
+    """
+    top = max(histogram.values(), default=0)
+    for key in sorted(histogram):
+        count = histogram[key]
+        bar = "#" * max(1, round(BAR_WIDTH * count / top))
+        print(f"    {key:>8}: {count:>12} {unit} {bar}")
+
+
+if __name__ == "__main__":
+    main()
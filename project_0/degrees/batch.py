@@ -0,0 +1,106 @@
+import json
+import sys
+import time
+
+import degrees
+
+USAGE = "Usage: python batch.py [directory] [pairs_file] [--compact] [--snapshot] [--names]"
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    flags = [arg for arg in sys.argv[1:] if arg.startswith("--")]
+    if len(args) > 2 or any(flag not in ("--compact", "--snapshot", "--names") for flag in flags):
+        sys.exit(USAGE)
+    directory = args[0] if len(args) >= 1 else "large"
+    pairs_file = args[1] if len(args) == 2 else "-"
+
+    # Progress goes to stderr, stdout only contains the results
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(directory, compact="--compact" in flags, snapshot="--snapshot" in flags)
+    if "--names" in flags:
+        degrees.load_name_index(directory)
+    print("Data loaded.", file=sys.stderr)
+
+    if pairs_file == "-":
+        queries = read_queries(sys.stdin)
+    else:
+        with open(pairs_file, encoding="utf-8") as f:
+            queries = read_queries(f)
+
+    for result in run_queries(queries):
+        print(json.dumps(result), flush=True)
+
+
+def read_queries(lines):
+    """
+    Parses the query lines: a source and a target (person ids or names) separated by a tab.
+    Returns a list of (line number, source, target).
+    """
+    queries = []
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        fields = [field.strip() for field in line.split("\t")]
+        if len(fields) != 2:
+            queries.append((line_number, line, None))
+        else:
+            queries.append((line_number, fields[0], fields[1]))
+    return queries
+
+
+def run_queries(queries):
+    """
+    Yields a result dictionary for each of the (line number, source, target) queries.
+
+    Queries are grouped by source, so that each source is searched only once
+    and its BFS tree serves all of its targets. Results are yielded as soon as they are found,
+    so they are not in input order (the line number identifies the query).
+    The time of a result is the number of seconds from the start of the search of its source
+    until its target has been reached.
+    """
+    by_source = {}
+    for line_number, source, target in queries:
+        result = {"line": line_number, "source": source, "target": target}
+        if target is None:
+            yield dict(result, error="expected a source and a target separated by a tab")
+            continue
+
+        source_id, target_id = resolve(source), resolve(target)
+        if source_id is None or target_id is None:
+            yield dict(result, error=f"person not found: {source if source_id is None else target}")
+            continue
+        by_source.setdefault(source_id, {}).setdefault(target_id, []).append(result)
+
+    for source_id, targets in by_source.items():
+        start = time.perf_counter()
+        for target_id, path in degrees.shortest_paths(source_id, list(targets)):
+            elapsed = time.perf_counter() - start
+            for result in targets[target_id]:
+                yield dict(
+                    result,
+                    path=path,
+                    degrees=None if path is None else len(path),
+                    time=elapsed,
+                    shared=len(targets) > 1
+                )
+
+
+def resolve(person):
+    """
+    Returns the person id of a person id or a name, without asking anything.
+    Ambiguous names are resolved only if the name index is loaded (otherwise None is returned).
+    """
+    if person in degrees.people:
+        return person
+    if degrees.name_index is not None:
+        return degrees.name_index.resolve(person)
+    person_ids = degrees.names.get(person.lower(), set())
+    if len(person_ids) == 1:
+        return next(iter(person_ids))
+    return None
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import random
+import sys
+import time
+
+import degrees
+from util import Node, QueueFrontier, DequeQueueFrontier
+
+USAGE = "Usage: python benchmark.py [directory] [samples] [--max-expansions=N] [--time-limit=SECONDS]"
+
+SAMPLES = 5
+# Bounds of each search with the list QueueFrontier, quadratic in the frontier size
+# (0 for no bound): the deque frontier then expands as many people, so both are compared at the same points
+MAX_EXPANSIONS = 10_000
+TIME_LIMIT = 10
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    options = dict(arg[2:].partition("=")[::2] for arg in sys.argv[1:] if arg.startswith("--"))
+    if len(args) > 2 or any(option not in ("max-expansions", "time-limit") for option in options):
+        sys.exit(USAGE)
+    directory = args[0] if args else "large"
+    try:
+        samples = int(args[1]) if len(args) == 2 else SAMPLES
+        max_expansions = int(options.get("max-expansions", MAX_EXPANSIONS)) or None
+        time_limit = float(options.get("time-limit", TIME_LIMIT)) or None
+    except ValueError:
+        sys.exit(USAGE)
+
+    print("Loading data...")
+    degrees.load_data(directory)
+    print("Data loaded.")
+
+    sources = random.sample(list(degrees.people), min(samples, len(degrees.people)))
+    expansions = {}
+    for frontier_class in (QueueFrontier, DequeQueueFrontier):
+        print(f"{frontier_class.__name__}")
+        for source in sources:
+            if frontier_class is QueueFrontier:
+                sizes, elapsed, complete = sweep(source, frontier_class, max_expansions, time_limit)
+                expansions[source] = len(sizes)
+            else:
+                sizes, elapsed, complete = sweep(source, frontier_class, expansions[source])
+            print(f"    source {source}: {len(sizes)} expanded{'' if complete else ' (stopped)'}, "
+                  f"max frontier {max(sizes)}, {elapsed:.3f}s")
+            # Frontier size sampled at increasing orders of magnitude of expansions
+            for checkpoint in checkpoints(len(sizes)):
+                print(f"        after {checkpoint} expansions: frontier {sizes[checkpoint - 1]}")
+
+
+def sweep(source, frontier_class, max_expansions=None, time_limit=None):
+    """
+    Runs a BFS from source using the given frontier class, until every reachable person is expanded
+    or max_expansions people are or time_limit seconds have passed.
+    Returns the frontier size after each expansion, the elapsed time and whether the search completed.
+    """
+    frontier = frontier_class()
+    frontier.add(Node(source, None, None))
+    visited = set()
+    sizes = []
+
+    start = time.perf_counter()
+    while not frontier.empty():
+        if max_expansions is not None and len(sizes) >= max_expansions:
+            break
+        if time_limit is not None and time.perf_counter() - start >= time_limit:
+            break
+        node = frontier.remove()
+        visited.add(node.state)
+        for (movie_id, person_id) in degrees.neighbors_for_person(node.state):
+            if person_id not in visited and not frontier.contains_state(person_id):
+                frontier.add(Node(person_id, node, movie_id))
+        sizes.append(len(frontier.frontier))
+    elapsed = time.perf_counter() - start
+
+    return sizes, elapsed, frontier.empty()
+
+
+def checkpoints(expanded):
+    """
+    Returns the expansion counts (powers of 10) at which the frontier size is reported.
+    """
+    result = []
+    checkpoint = 1
+    while checkpoint <= expanded:
+        result.append(checkpoint)
+        checkpoint *= 10
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,13 @@
 import csv
+import os
 import sys
 
-from util import Node, StackFrontier, QueueFrontier
+from graph import CompactGraph
+from landmarks import LandmarkIndex, LANDMARKS, build_index, index_path, is_stale as landmarks_stale
+from ingest import Progress, paused_gc, read_dataset
+from nameindex import open_index
+from snapshot import open_snapshot
+from util import Node, DequeQueueFrontier
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,20 +18,60 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Compact integer-indexed graph (see graph.py), replaces the movies/stars sets when loaded in compact mode
+graph = None
 
-def load_data(directory):
+# Landmark index (see landmarks.py) of the compact graph, used to bound and guide the searches when loaded
+landmarks = None
+
+# Name index (see nameindex.py), resolves names without asking when loaded
+name_index = None
+
+
+def load_data(directory, compact=False, snapshot=False, streaming=False):
     """
     Load data from CSV files into memory.
+
+    In streaming mode, the CSV files are parsed in chunks and concurrently by ingest.py,
+    reporting the progress on stderr.
+
+    In compact mode, the `movies` of people and the `stars` of movies are not stored
+    in the dictionaries, the relations are kept in the compact `graph` instead.
+
+    In snapshot mode, the data is memory-mapped from the binary snapshot of the directory
+    (compiled first if missing or older than the CSV files), and `names`, `people` and `movies`
+    become read-only views over it.
     """
+    global graph, names, people, movies
+
+    if snapshot:
+        data = open_snapshot(directory)
+        names, people, movies, graph = data.names, data.people, data.movies, data.graph
+        return
+
+    # A previous snapshot load replaces the dictionaries with read-only views
+    if not isinstance(people, dict):
+        names, people, movies = {}, {}, {}
+    graph = None
+
+    if streaming:
+        progress = Progress()
+        with paused_gc():
+            columns = read_dataset(directory, progress=progress)
+            progress.done()
+            load_columns(columns, compact)
+        return
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
             people[row["id"]] = {
                 "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
+                "birth": row["birth"]
             }
+            if not compact:
+                people[row["id"]]["movies"] = set()
             if row["name"].lower() not in names:
                 names[row["name"].lower()] = {row["id"]}
             else:
@@ -37,13 +83,17 @@ def load_data(directory):
         for row in reader:
             movies[row["id"]] = {
                 "title": row["title"],
-                "year": row["year"],
-                "stars": set()
+                "year": row["year"]
             }
+            if not compact:
+                movies[row["id"]]["stars"] = set()
 
     # Load stars
     with open(f"{directory}/stars.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
+        if compact:
+            graph = CompactGraph.build(list(people), list(movies), ((row["person_id"], row["movie_id"]) for row in reader))
+            return
         for row in reader:
             try:
                 people[row["person_id"]]["movies"].add(row["movie_id"])
@@ -52,14 +102,74 @@ def load_data(directory):
                 pass
 
 
+def load_columns(columns, compact):
+    """
+    Loads the columns parsed by ingest.read_dataset into memory.
+    """
+    global graph
+
+    for person_id, name, birth in zip(*columns["people.csv"]):
+        people[person_id] = {"name": name, "birth": birth}
+        if not compact:
+            people[person_id]["movies"] = set()
+        names.setdefault(name.lower(), set()).add(person_id)
+
+    for movie_id, title, year in zip(*columns["movies.csv"]):
+        movies[movie_id] = {"title": title, "year": year}
+        if not compact:
+            movies[movie_id]["stars"] = set()
+
+    if compact:
+        graph = CompactGraph.build(list(people), list(movies), zip(*columns["stars.csv"]))
+        return
+    for person_id, movie_id in zip(*columns["stars.csv"]):
+        try:
+            people[person_id]["movies"].add(movie_id)
+            movies[movie_id]["stars"].add(person_id)
+        except KeyError:
+            pass
+
+
+def load_landmarks(directory, k=LANDMARKS):
+    """
+    Loads the landmark index of the directory, building it first if missing or stale.
+    Data must be already loaded in compact or snapshot mode.
+    """
+    global landmarks
+
+    if landmarks_stale(directory):
+        build_index(directory, graph, k, os.cpu_count())
+    landmarks = LandmarkIndex(index_path(directory))
+
+
+def load_name_index(directory):
+    """
+    Loads the name index of the directory, building it first if missing or stale.
+    """
+    global name_index
+    name_index = open_index(directory)
+
+
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    flags = [arg for arg in sys.argv[1:] if arg.startswith("--")]
+    if len(args) > 1 or any(flag not in ("--bidirectional", "--compact", "--snapshot", "--streaming", "--landmarks",
+                                         "--names") for flag in flags):
+        sys.exit("Usage: python degrees.py [directory] [--bidirectional] [--compact] [--snapshot] [--streaming] "
+                 "[--landmarks] [--names]")
+    directory = args[0] if len(args) == 1 else "large"
+    bidirectional = "--bidirectional" in flags
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    # The landmark index needs the compact graph, from the snapshot if not asked otherwise
+    load_data(directory, compact="--compact" in flags,
+              snapshot="--snapshot" in flags or ("--landmarks" in flags and "--compact" not in flags),
+              streaming="--streaming" in flags)
+    if "--landmarks" in flags:
+        load_landmarks(directory)
+    if "--names" in flags:
+        load_name_index(directory)
     print("Data loaded.")
 
     source = person_id_for_name(input("Name: "))
@@ -69,7 +179,11 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    if landmarks is not None:
+        lower, upper = landmarks.bounds(graph.person_indexes[source], graph.person_indexes[target])
+        print(f"Landmark bounds: between {lower} and {upper} degrees.")
+
+    path = shortest_path(source, target, bidirectional)
 
     if path is None:
         print("Not connected.")
@@ -84,18 +198,34 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, bidirectional=False):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
+    If bidirectional is True, the search grows from both ends
+    (see `bidirectional_shortest_path`).
+
+    If the data has been loaded in compact mode, the search runs over
+    the indexes of the compact graph and the ids are translated back only for the result.
+    If the landmark index is loaded too, the (not bidirectional) search is an A* guided by it.
+
     If no possible path, returns None.
     """
-    
+    if graph is not None:
+        source_index, target_index = graph.person_indexes[source], graph.person_indexes[target]
+        if landmarks is not None and not bidirectional:
+            path = landmarks.shortest_path(graph, source_index, target_index)
+        else:
+            path = graph.shortest_path(source_index, target_index, bidirectional)
+        return None if path is None else graph.translate(path)
+    if bidirectional:
+        return bidirectional_shortest_path(source, target)
+
     # Since the `neighbors_for_person` function is available, there is no need to build the entire graph using the Node class.
     # Instead only the useful nodes are instantiated.
     
-    frontier = QueueFrontier()
+    frontier = DequeQueueFrontier()
     visited = {} # Dictionary (hashtable) for a more efficient lookup
 
     # BFS of the graph
@@ -111,7 +241,7 @@ def shortest_path(source, target):
                 curr_node = Node(person_id, curr_node, movie_id)
                 break
 
-            if not (person_id in visited):
+            if not (person_id in visited) and not frontier.contains_state(person_id):
                 frontier.add(Node(person_id, curr_node, movie_id))
 
     if curr_node.state != target: # Actors are not connected
@@ -128,11 +258,132 @@ def shortest_path(source, target):
         return path
 
 
+def bidirectional_shortest_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, searching at the same time
+    from the source and from the target until the two searches meet.
+
+    If no possible path, returns None.
+    """
+    if source == target:
+        return []
+
+    # For each side, maps a reached person to the (movie_id, person_id) pair that leads
+    # one step back towards the side's origin, and to the distance from the origin
+    forward_parents, forward_distances = {source: None}, {source: 0}
+    backward_parents, backward_distances = {target: None}, {target: 0}
+    forward_level, backward_level = [source], [target]
+    meeting, best_length = None, None
+
+    while forward_level and backward_level and meeting is None:
+        # Always expand the smallest level, this is what keeps the search small on hub-heavy graphs
+        if len(forward_level) <= len(backward_level):
+            parents, distances, other_distances = forward_parents, forward_distances, backward_distances
+            level = forward_level
+        else:
+            parents, distances, other_distances = backward_parents, backward_distances, forward_distances
+            level = backward_level
+
+        # The whole level is expanded before stopping, so that the shortest of the meetings is chosen
+        next_level = []
+        for person_id in level:
+            for (movie_id, neighbor_id) in neighbors_for_person(person_id):
+                if neighbor_id in parents:
+                    continue
+                parents[neighbor_id] = (movie_id, person_id)
+                distances[neighbor_id] = distances[person_id] + 1
+                next_level.append(neighbor_id)
+
+                if neighbor_id in other_distances:
+                    length = distances[neighbor_id] + other_distances[neighbor_id]
+                    if best_length is None or length < best_length:
+                        meeting, best_length = neighbor_id, length
+
+        if level is forward_level:
+            forward_level = next_level
+        else:
+            backward_level = next_level
+
+    if meeting is None: # Actors are not connected
+        return None
+
+    # Reconstruct the half of the path from the source to the meeting point
+    path = unwind(forward_parents, meeting)
+
+    # Reconstruct the half of the path from the meeting point to the target
+    person_id = meeting
+    while backward_parents[person_id] is not None:
+        movie_id, next_id = backward_parents[person_id]
+        path.append((movie_id, next_id))
+        person_id = next_id
+
+    return path
+
+
+def shortest_paths(source, targets):
+    """
+    Yields a (target, path) pair for each of the targets, as soon as it is reached.
+    A single BFS tree from the source is shared by all the targets.
+
+    Path has the same format of shortest_path (None if not connected).
+    """
+    if graph is not None:
+        targets = {graph.person_indexes[target]: target for target in targets}
+        for target, path in graph.shortest_paths(graph.person_indexes[source], targets):
+            yield (targets[target], None if path is None else graph.translate(path))
+        return
+
+    remaining = set(targets)
+    if source in remaining:
+        remaining.discard(source)
+        yield (source, [])
+
+    # Maps each reached person to the (movie_id, person_id) pair from which it has been reached
+    parents = {source: None}
+    frontier = DequeQueueFrontier()
+    frontier.add(Node(source, None, None))
+    while not frontier.empty() and remaining:
+        person_id = frontier.remove().state
+        for (movie_id, neighbor_id) in neighbors_for_person(person_id):
+            if neighbor_id in parents:
+                continue
+            parents[neighbor_id] = (movie_id, person_id)
+            frontier.add(Node(neighbor_id, None, movie_id))
+
+            if neighbor_id in remaining:
+                remaining.discard(neighbor_id)
+                yield (neighbor_id, unwind(parents, neighbor_id))
+
+    for target in remaining:
+        yield (target, None)
+
+
+def unwind(parents, person_id):
+    """
+    Returns the list of (movie_id, person_id) pairs that leads to person_id,
+    following the (movie_id, person_id) parents up to the root of the search.
+    """
+    path = []
+    while parents[person_id] is not None:
+        movie_id, previous_id = parents[person_id]
+        path.append((movie_id, person_id))
+        person_id = previous_id
+    path.reverse()
+    return path
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
+
+    If the name index is loaded, ambiguities are resolved by rank (and misspelled names
+    by edit distance) without asking.
     """
+    if name_index is not None:
+        return name_index.resolve(name)
+
     person_ids = list(names.get(name.lower(), set()))
     if len(person_ids) == 0:
         return None
@@ -159,6 +410,9 @@ def neighbors_for_person(person_id):
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if graph is not None:
+        return set(graph.translate(graph.neighbors(graph.person_indexes[person_id])))
+
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
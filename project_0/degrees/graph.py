@@ -0,0 +1,276 @@
+from array import array
+
+# Type code of the arrays storing indexes (signed 32 bits, -1 is used as "no index")
+INDEX_TYPE = "i"
+
+
+class CompactGraph():
+    """
+    Bipartite people/movies graph stored in CSR form.
+
+    People and movies are mapped to dense integer indexes, and the adjacency lists
+    are stored in flat arrays: the movies of the person p are
+    person_movies[person_offsets[p]:person_offsets[p + 1]], and the people of the movie m
+    are movie_people[movie_offsets[m]:movie_offsets[m + 1]].
+    """
+
+    def __init__(self, person_ids, movie_ids, person_offsets, person_movies, movie_offsets, movie_people,
+                 person_indexes=None, movie_indexes=None):
+        """
+        Ids and arrays can be any indexable sequence (e.g. memoryviews over a snapshot).
+        person_indexes and movie_indexes map ids back to indexes, if not given they are built as dictionaries.
+        """
+        self.person_ids = person_ids
+        self.movie_ids = movie_ids
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+
+        # Reverse lookups, from string id to index
+        if person_indexes is None:
+            person_indexes = {person_id: i for i, person_id in enumerate(person_ids)}
+        if movie_indexes is None:
+            movie_indexes = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+        self.person_indexes = person_indexes
+        self.movie_indexes = movie_indexes
+
+    @classmethod
+    def build(cls, person_ids, movie_ids, stars):
+        """
+        Builds the graph from the lists of person and movie ids
+        and an iterable of (person_id, movie_id) pairs.
+        Pairs referring to unknown ids are ignored.
+        """
+        person_indexes = {person_id: i for i, person_id in enumerate(person_ids)}
+        movie_indexes = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+
+        star_people, star_movies = array(INDEX_TYPE), array(INDEX_TYPE)
+        for person_id, movie_id in stars:
+            try:
+                person, movie = person_indexes[person_id], movie_indexes[movie_id]
+            except KeyError:
+                continue
+            star_people.append(person)
+            star_movies.append(movie)
+
+        person_offsets, person_movies = _csr(len(person_ids), star_people, star_movies)
+        movie_offsets, movie_people = _csr(len(movie_ids), star_movies, star_people)
+        return cls(list(person_ids), list(movie_ids), person_offsets, person_movies, movie_offsets, movie_people)
+
+    @classmethod
+    def from_data(cls, people, movies):
+        """
+        Builds the graph from the `people` and `movies` dictionaries of degrees.py.
+        """
+        stars = (
+            (person_id, movie_id)
+            for person_id, person in people.items()
+            for movie_id in person["movies"]
+        )
+        return cls.build(list(people), list(movies), stars)
+
+    def person_count(self):
+        return len(self.person_ids)
+
+    def movies_of(self, person):
+        return self.person_movies[self.person_offsets[person]:self.person_offsets[person + 1]]
+
+    def people_of(self, movie):
+        return self.movie_people[self.movie_offsets[movie]:self.movie_offsets[movie + 1]]
+
+    def neighbors(self, person):
+        """
+        Yields the (movie, person) index pairs of the people who starred with a given person.
+        """
+        person_movies, movie_people = self.person_movies, self.movie_people
+        movie_offsets = self.movie_offsets
+        for k in range(self.person_offsets[person], self.person_offsets[person + 1]):
+            movie = person_movies[k]
+            for h in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                yield (movie, movie_people[h])
+
+    def shortest_path(self, source, target, bidirectional=False):
+        """
+        Returns the shortest list of (movie, person) index pairs
+        that connect the source to the target (both indexes).
+
+        If no possible path, returns None.
+        """
+        if source == target:
+            return []
+        if bidirectional:
+            return self._bidirectional_shortest_path(source, target)
+
+        # parent_person[p] is the person from which p has been reached (-1 if not reached yet)
+        parent_person = array(INDEX_TYPE, [-1]) * self.person_count()
+        parent_movie = array(INDEX_TYPE, [-1]) * self.person_count()
+        parent_person[source] = source
+        level = [source]
+
+        while level:
+            next_level = []
+            for person in level:
+                for (movie, neighbor) in self.neighbors(person):
+                    if parent_person[neighbor] != -1:
+                        continue
+                    parent_person[neighbor], parent_movie[neighbor] = person, movie
+                    if neighbor == target:
+                        return unwind(parent_person, parent_movie, source, target)
+                    next_level.append(neighbor)
+            level = next_level
+
+        return None
+
+    def shortest_paths(self, source, targets):
+        """
+        Yields a (target, path) pair for each of the targets (indexes), as soon as it is reached
+        by a single BFS from the source. Path has the same format of shortest_path.
+        """
+        remaining = set(targets)
+        if source in remaining:
+            remaining.discard(source)
+            yield (source, [])
+
+        parent_person = array(INDEX_TYPE, [-1]) * self.person_count()
+        parent_movie = array(INDEX_TYPE, [-1]) * self.person_count()
+        parent_person[source] = source
+        level = [source]
+
+        while level and remaining:
+            next_level = []
+            for person in level:
+                for (movie, neighbor) in self.neighbors(person):
+                    if parent_person[neighbor] != -1:
+                        continue
+                    parent_person[neighbor], parent_movie[neighbor] = person, movie
+                    if neighbor in remaining:
+                        remaining.discard(neighbor)
+                        yield (neighbor, unwind(parent_person, parent_movie, source, neighbor))
+                    next_level.append(neighbor)
+            level = next_level
+
+        for target in remaining:
+            yield (target, None)
+
+    def distances(self, source):
+        """
+        Returns the array of the distances (number of movies) from the source
+        to every person, -1 for the people not connected to the source.
+        """
+        person_offsets, person_movies = self.person_offsets, self.person_movies
+        movie_offsets, movie_people = self.movie_offsets, self.movie_people
+
+        distance = array(INDEX_TYPE, [-1]) * self.person_count()
+        distance[source] = 0
+        # Each movie is scanned only the first time it is reached, its people are all reached then
+        movie_seen = bytearray(len(self.movie_ids))
+        level = [source]
+        depth = 0
+
+        while level:
+            depth += 1
+            next_level = []
+            for person in level:
+                for k in range(person_offsets[person], person_offsets[person + 1]):
+                    movie = person_movies[k]
+                    if movie_seen[movie]:
+                        continue
+                    movie_seen[movie] = 1
+                    for h in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                        neighbor = movie_people[h]
+                        if distance[neighbor] == -1:
+                            distance[neighbor] = depth
+                            next_level.append(neighbor)
+            level = next_level
+
+        return distance
+
+    def _bidirectional_shortest_path(self, source, target):
+        """
+        Same of degrees.bidirectional_shortest_path, over indexes.
+        """
+        n = self.person_count()
+        forward = (array(INDEX_TYPE, [-1]) * n, array(INDEX_TYPE, [-1]) * n, array(INDEX_TYPE, [-1]) * n)
+        backward = (array(INDEX_TYPE, [-1]) * n, array(INDEX_TYPE, [-1]) * n, array(INDEX_TYPE, [-1]) * n)
+        forward[0][source], forward[2][source] = source, 0
+        backward[0][target], backward[2][target] = target, 0
+        forward_level, backward_level = [source], [target]
+        meeting, best_length = None, None
+
+        while forward_level and backward_level and meeting is None:
+            if len(forward_level) <= len(backward_level):
+                (parent_person, parent_movie, distance), other_distance = forward, backward[2]
+                level = forward_level
+            else:
+                (parent_person, parent_movie, distance), other_distance = backward, forward[2]
+                level = backward_level
+
+            next_level = []
+            for person in level:
+                for (movie, neighbor) in self.neighbors(person):
+                    if parent_person[neighbor] != -1:
+                        continue
+                    parent_person[neighbor], parent_movie[neighbor] = person, movie
+                    distance[neighbor] = distance[person] + 1
+                    next_level.append(neighbor)
+
+                    if other_distance[neighbor] != -1:
+                        length = distance[neighbor] + other_distance[neighbor]
+                        if best_length is None or length < best_length:
+                            meeting, best_length = neighbor, length
+
+            if level is forward_level:
+                forward_level = next_level
+            else:
+                backward_level = next_level
+
+        if meeting is None:
+            return None
+
+        path = unwind(forward[0], forward[1], source, meeting)
+        person = meeting
+        while person != target:
+            path.append((backward[1][person], backward[0][person]))
+            person = backward[0][person]
+        return path
+
+    def translate(self, path):
+        """
+        Translates a path of (movie, person) indexes into (movie_id, person_id) pairs.
+        """
+        return [(self.movie_ids[movie], self.person_ids[person]) for movie, person in path]
+
+
+def _csr(size, rows, columns):
+    """
+    Groups the (rows[k], columns[k]) pairs by row.
+    Returns the offsets and the grouped columns arrays.
+    """
+    offsets = array(INDEX_TYPE, [0]) * (size + 1)
+    for row in rows:
+        offsets[row + 1] += 1
+    for i in range(size):
+        offsets[i + 1] += offsets[i]
+
+    grouped = array(INDEX_TYPE, [0]) * len(rows)
+    cursor = array(INDEX_TYPE, offsets)
+    for row, column in zip(rows, columns):
+        grouped[cursor[row]] = column
+        cursor[row] += 1
+
+    return offsets, grouped
+
+
+def unwind(parent_person, parent_movie, source, target):
+    """
+    Follows the parent arrays from target back to source.
+    Returns the list of (movie, person) index pairs from source to target.
+    """
+    path = []
+    person = target
+    while person != source:
+        path.append((parent_movie[person], person))
+        person = parent_person[person]
+    path.reverse()
+    return path
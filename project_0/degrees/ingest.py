@@ -0,0 +1,199 @@
+import csv
+import gc
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+
+USAGE = "Usage: python ingest.py [--rows=N] [--directory=DIR]"
+
+# Number of rows parsed at a time
+CHUNK_SIZE = 65536
+# Rows of the synthetic stars.csv of the benchmark
+BENCHMARK_ROWS = 10_000_000
+
+# Columns read from each file, in order
+COLUMNS = {
+    "people.csv": ("id", "name", "birth"),
+    "movies.csv": ("id", "title", "year"),
+    "stars.csv": ("person_id", "movie_id"),
+}
+# Columns holding ids, whose strings are interned (the same id string is then stored once)
+ID_COLUMNS = {"id", "person_id", "movie_id"}
+
+
+def main():
+    options = dict(arg[2:].partition("=")[::2] for arg in sys.argv[1:] if arg.startswith("--"))
+    if len(options) != len(sys.argv) - 1 or any(option not in ("rows", "directory") for option in options):
+        sys.exit(USAGE)
+    try:
+        rows = int(options.get("rows", BENCHMARK_ROWS))
+    except ValueError:
+        sys.exit(USAGE)
+    directory = options.get("directory") or tempfile.mkdtemp(prefix="degrees-")
+
+    if not os.path.exists(os.path.join(directory, "stars.csv")):
+        print(f"Generating {rows} synthetic stars in {directory}...")
+        generate(directory, rows)
+
+    # Each loader runs in its own process, so that its peak memory is measured alone
+    for mode in ("csv.DictReader", "streaming"):
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(target=_benchmark_load, args=(directory, mode == "streaming", queue))
+        process.start()
+        elapsed, peak = queue.get()
+        process.join()
+        print(f"{mode}: {elapsed:.2f}s, peak memory {peak / 1024:.0f} MiB")
+
+
+def read_columns(path, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Parses a CSV file of the dataset, chunk by chunk, without building a dictionary per row.
+    Returns a list for each of its COLUMNS, with the ids interned.
+
+    progress, if given, is called after each chunk with the file name, the rows read so far
+    and the rows per second (None if not known).
+    """
+    name = os.path.basename(path)
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        positions = [header.index(column) for column in COLUMNS[name]]
+        columns = [[] for _ in positions]
+        interned = [column in ID_COLUMNS for column in COLUMNS[name]]
+
+        start = time.perf_counter()
+        rows = 0
+        while True:
+            chunk = list(islice(reader, chunk_size))
+            if not chunk:
+                break
+            # Blank lines are skipped, as csv.DictReader does
+            chunk = list(filter(None, chunk))
+            if not chunk:
+                continue
+            # Transposed at C speed, the chunk becomes a tuple of values per column
+            # (as many as the columns of its shortest row)
+            chunk_columns = list(zip(*chunk))
+            if len(chunk_columns) <= max(positions):
+                row = min(chunk, key=len)
+                raise Exception(f"{path}: row {row} has {len(row)} columns, {len(header)} expected")
+            for values, position, intern in zip(columns, positions, interned):
+                if intern:
+                    values.extend(map(sys.intern, chunk_columns[position]))
+                else:
+                    values.extend(chunk_columns[position])
+            rows += len(chunk)
+            if progress is not None:
+                progress(name, rows, rows / max(time.perf_counter() - start, 1e-9))
+
+    return columns
+
+
+def read_dataset(directory, concurrent=None, progress=None):
+    """
+    Parses the three CSV files of directory.
+    Returns a dictionary mapping each file name to its columns (see read_columns).
+
+    If concurrent, people.csv and movies.csv are parsed by worker processes while
+    stars.csv (the largest) is parsed by the calling one. The progress of the workers
+    is reported only once they are done. By default, it is concurrent if there are more CPUs.
+    """
+    paths = {name: os.path.join(directory, name) for name in COLUMNS}
+    if concurrent is None:
+        concurrent = os.cpu_count() > 1
+    if not concurrent:
+        return {name: read_columns(path, progress=progress) for name, path in paths.items()}
+
+    # Processes, since parsing holds the GIL and threads would only take turns
+    with ProcessPoolExecutor(2) as executor:
+        futures = {name: executor.submit(read_columns, paths[name]) for name in ("people.csv", "movies.csv")}
+        dataset = {"stars.csv": read_columns(paths["stars.csv"], progress=progress)}
+        for name, future in futures.items():
+            dataset[name] = future.result()
+            if progress is not None:
+                progress(name, len(dataset[name][0]), None)
+    return dataset
+
+
+@contextmanager
+def paused_gc():
+    """
+    Pauses the cyclic garbage collector.
+    Ingestion allocates millions of containers but no cycles, and the collections
+    triggered by those allocations would otherwise dominate the parsing time.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class Progress():
+    """
+    Progress callback for read_columns, keeps a single status line with all the files on stderr.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.status = {}
+
+    def __call__(self, name, rows, throughput):
+        with self.lock:
+            self.status[name] = f"{name}: {rows} rows"
+            if throughput is not None:
+                self.status[name] += f" ({throughput:.0f} rows/s)"
+            print("\r" + ", ".join(self.status.values()), end="", file=sys.stderr, flush=True)
+
+    def done(self):
+        if self.status:
+            print(file=sys.stderr)
+
+
+def generate(directory, rows, seed=0):
+    """
+    Writes a synthetic dataset with the given number of stars into directory.
+    """
+    generator = random.Random(seed)
+    people, movies = max(1, rows // 5), max(1, rows // 10)
+    os.makedirs(directory, exist_ok=True)
+
+    with open(os.path.join(directory, "people.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS["people.csv"])
+        writer.writerows((i, f"Person {i}", 1900 + i % 100) for i in range(people))
+    with open(os.path.join(directory, "movies.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS["movies.csv"])
+        writer.writerows((i, f"Movie {i}", 1900 + i % 120) for i in range(movies))
+    with open(os.path.join(directory, "stars.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS["stars.csv"])
+        writer.writerows((generator.randrange(people), generator.randrange(movies)) for _ in range(rows))
+
+
+def _benchmark_load(directory, streaming, queue):
+    """
+    Loads directory with degrees.load_data inside a benchmark process.
+    Puts its elapsed time and its peak memory (KiB) in the queue.
+    """
+    import degrees
+
+    start = time.perf_counter()
+    degrees.load_data(directory, streaming=streaming)
+    elapsed = time.perf_counter() - start
+    queue.put((elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+import heapq
+import math
+import mmap
+import multiprocessing
+import os
+import struct
+import sys
+from array import array
+
+from graph import INDEX_TYPE, unwind
+from snapshot import SOURCE_NAMES, open_snapshot
+
+USAGE = "Usage: python landmarks.py [directory] [--landmarks=K] [--workers=N]"
+
+# Default name of the index file, stored next to the CSV files
+INDEX_NAME = "landmarks.index"
+LANDMARKS = 16
+
+MAGIC = b"DEGLMK02"
+# Magic, fingerprint of the CSV files, number of people, number of landmarks
+HEADER = struct.Struct("<8sqqq")
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    options = dict(arg[2:].partition("=")[::2] for arg in sys.argv[1:] if arg.startswith("--"))
+    if len(args) > 1 or any(option not in ("landmarks", "workers") for option in options):
+        sys.exit(USAGE)
+    directory = args[0] if len(args) == 1 else "large"
+    try:
+        k = int(options.get("landmarks", LANDMARKS))
+        workers = int(options.get("workers", os.cpu_count()))
+    except ValueError:
+        sys.exit(USAGE)
+
+    print("Loading data...")
+    graph = open_snapshot(directory).graph
+    print("Data loaded.")
+
+    added = build_index(directory, graph, k, workers)
+    print(f"{added} landmarks added, {len(LandmarkIndex(index_path(directory)).landmarks)} in the index.")
+
+
+def index_path(directory):
+    return os.path.join(directory, INDEX_NAME)
+
+
+def fingerprint(directory):
+    """
+    Returns the modification time (ns) of the most recently changed CSV file of directory.
+    """
+    return max(os.stat(os.path.join(directory, name)).st_mtime_ns for name in SOURCE_NAMES)
+
+
+def is_stale(directory):
+    """
+    Returns True if the landmark index of directory is missing or was built from different CSV files.
+    """
+    path = index_path(directory)
+    if not os.path.exists(path):
+        return True
+    with open(path, "rb") as f:
+        header = f.read(HEADER.size)
+    if len(header) < HEADER.size:
+        return True
+    magic, built_from, _, _ = HEADER.unpack(header)
+    return magic != MAGIC or built_from != fingerprint(directory)
+
+
+def by_degree(graph):
+    """
+    Returns the people indexes sorted by decreasing number of co-star links.
+    """
+    degree = [0] * graph.person_count()
+    for movie in range(len(graph.movie_ids)):
+        cast = graph.movie_offsets[movie + 1] - graph.movie_offsets[movie]
+        for person in graph.people_of(movie):
+            degree[person] += cast - 1
+    return sorted(range(graph.person_count()), key=lambda person: -degree[person])
+
+
+def build_index(directory, graph, k, workers):
+    """
+    Makes the landmark index of directory have (at least) k landmarks,
+    chosen among the people with the highest degree.
+
+    The build is incremental: if the data is unchanged, the landmarks already in the index are kept,
+    and only the distances of the new ones are computed (in parallel) and appended.
+    An index built from different CSV files is rebuilt from scratch.
+    Returns the number of landmarks added.
+    """
+    path = index_path(directory)
+    built_from = fingerprint(directory)
+    existing = []
+    if not is_stale(directory):
+        index = LandmarkIndex(path)
+        if index.person_count == graph.person_count():
+            existing = index.landmarks
+        index.close()
+    if not existing:
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, built_from, graph.person_count(), 0))
+
+    new = [person for person in by_degree(graph) if person not in existing][:max(0, k - len(existing))]
+    if not new:
+        return 0
+
+    with multiprocessing.Pool(min(workers, len(new)), initializer=_init_worker, initargs=(directory,)) as pool:
+        rows = pool.map(_landmark_row, new)
+
+    # Rows are appended first, and the header counts them only once they are all written
+    with open(path, "r+b") as f:
+        f.seek(HEADER.size + len(existing) * (graph.person_count() + 1) * 4)
+        for landmark, distances in zip(new, rows):
+            f.write(array(INDEX_TYPE, [landmark]).tobytes())
+            f.write(distances)
+        f.flush()
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, built_from, graph.person_count(), len(existing) + len(new)))
+
+    return len(new)
+
+
+# Graph of the worker processes
+worker_graph = None
+
+
+def _init_worker(directory):
+    global worker_graph
+    worker_graph = open_snapshot(directory).graph
+
+
+def _landmark_row(landmark):
+    return worker_graph.distances(landmark).tobytes()
+
+
+class LandmarkIndex():
+    """
+    Memory-mapped table of the distances from each landmark to every person.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, _, self.person_count, k = HEADER.unpack_from(self.mmap)
+        if magic != MAGIC:
+            raise Exception(f"{path} is not a landmark index")
+
+        # Each row is the landmark followed by its distances
+        table = memoryview(self.mmap)[HEADER.size:HEADER.size + k * (self.person_count + 1) * 4].cast(INDEX_TYPE)
+        self.landmarks = [table[i * (self.person_count + 1)] for i in range(k)]
+        self.distances = [
+            table[i * (self.person_count + 1) + 1:(i + 1) * (self.person_count + 1)] for i in range(k)
+        ]
+        self.views = self.distances + [table]
+
+    def close(self):
+        # The views must be released before unmapping the file
+        for view in self.views:
+            view.release()
+        self.distances, self.views = [], []
+        self.mmap.close()
+
+    def bounds(self, source, target):
+        """
+        Returns the (lower, upper) bounds of the separation of source and target (indexes), in O(K).
+        lower is math.inf if they are surely not connected, upper is math.inf if no landmark connects them.
+        """
+        lower, upper = 0, math.inf
+        for distance in self.distances:
+            to_source, to_target = distance[source], distance[target]
+            if to_source == -1 and to_target == -1:
+                continue
+            if to_source == -1 or to_target == -1:
+                # Only one of the two is in the component of the landmark
+                return (math.inf, math.inf)
+            lower = max(lower, abs(to_source - to_target))
+            upper = min(upper, to_source + to_target)
+        return (lower, upper)
+
+    def shortest_path(self, graph, source, target):
+        """
+        A* search from source to target (indexes) guided by the landmark lower bounds.
+        Returns the same of CompactGraph.shortest_path.
+        """
+        if source == target:
+            return []
+        if self.bounds(source, target)[0] == math.inf:
+            return None
+
+        to_target = [(distance, distance[target]) for distance in self.distances]
+
+        def heuristic(person):
+            estimate = 0
+            for distance, target_distance in to_target:
+                person_distance = distance[person]
+                if (person_distance == -1) != (target_distance == -1):
+                    return math.inf
+                if person_distance != -1:
+                    estimate = max(estimate, abs(person_distance - target_distance))
+            return estimate
+
+        parent_person = array(INDEX_TYPE, [-1]) * graph.person_count()
+        parent_movie = array(INDEX_TYPE, [-1]) * graph.person_count()
+        cost = {source: 0}
+        parent_person[source] = source
+        # Ties are broken in favour of the deepest entries, which are closer to the target
+        frontier = [(heuristic(source), 0, source)]
+
+        while frontier:
+            _, negative_cost, person = heapq.heappop(frontier)
+            person_cost = -negative_cost
+            if person == target:
+                return unwind(parent_person, parent_movie, source, target)
+            if person_cost > cost[person]:
+                continue # Outdated entry
+
+            for (movie, neighbor) in graph.neighbors(person):
+                if neighbor in cost and cost[neighbor] <= person_cost + 1:
+                    continue
+                estimate = heuristic(neighbor)
+                if estimate == math.inf:
+                    continue
+                cost[neighbor] = person_cost + 1
+                parent_person[neighbor], parent_movie[neighbor] = person, movie
+                heapq.heappush(frontier, (person_cost + 1 + estimate, -(person_cost + 1), neighbor))
+
+        return None
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import csv
+import os
+import pickle
+from bisect import bisect_left
+from collections import Counter
+
+# Default name of the index file, stored next to the CSV files
+INDEX_NAME = "names.index"
+VERSION = 1
+
+# Maximum number of postings read by a fuzzy search, bounds its latency on very common n-grams
+POSTINGS_BUDGET = 200000
+# Maximum number of candidates whose edit distance is computed by a fuzzy search
+MAX_CANDIDATES = 200
+
+
+def index_path(directory):
+    return os.path.join(directory, INDEX_NAME)
+
+
+def open_index(directory):
+    """
+    Returns the NameIndex of directory, building and saving it first if missing
+    or older than the CSV files.
+    """
+    path = index_path(directory)
+    sources = [os.path.join(directory, name) for name in ("people.csv", "stars.csv")]
+    if os.path.exists(path) and all(os.path.getmtime(source) <= os.path.getmtime(path) for source in sources):
+        with open(path, "rb") as f:
+            index = pickle.load(f)
+        if isinstance(index, NameIndex) and index.version == VERSION:
+            return index
+
+    index = NameIndex.from_csv(directory)
+    with open(path + ".tmp", "wb") as f:
+        pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(path + ".tmp", path)
+    return index
+
+
+class NameIndex():
+    """
+    Index of the people names supporting exact, prefix and fuzzy (edit distance) lookups.
+
+    Names are lowercase. The people with the same name are ranked by number of movies,
+    which is used to resolve ambiguities without asking.
+    """
+
+    def __init__(self, people):
+        """
+        people is an iterable of (person_id, name, movie count).
+        """
+        self.version = VERSION
+
+        # Maps each name to its person ids, from the highest ranked
+        self.ids = {}
+        ranks = {}
+        for person_id, name, rank in people:
+            self.ids.setdefault(name.lower(), []).append(person_id)
+            ranks[person_id] = rank
+        for person_ids in self.ids.values():
+            person_ids.sort(key=lambda person_id: (-ranks[person_id], person_id))
+        self.ranks = ranks
+
+        # Sorted names for the prefix searches
+        self.keys = sorted(self.ids)
+
+        # Maps each trigram to the positions in keys of the names containing it
+        self.grams = {}
+        for position, key in enumerate(self.keys):
+            for gram in set(trigrams(key)):
+                self.grams.setdefault(gram, []).append(position)
+
+    @classmethod
+    def from_csv(cls, directory):
+        movie_counts = Counter()
+        with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                movie_counts[row["person_id"]] += 1
+        with open(f"{directory}/people.csv", encoding="utf-8") as f:
+            return cls((row["id"], row["name"], movie_counts[row["id"]]) for row in csv.DictReader(f))
+
+    def exact(self, name):
+        """
+        Returns the person ids with the given name, from the highest ranked.
+        """
+        return list(self.ids.get(name.lower(), []))
+
+    def prefix(self, prefix, limit=10):
+        """
+        Returns up to limit names starting with prefix, in alphabetical order.
+        """
+        prefix = prefix.lower()
+        matches = []
+        position = bisect_left(self.keys, prefix)
+        while position < len(self.keys) and len(matches) < limit and self.keys[position].startswith(prefix):
+            matches.append(self.keys[position])
+            position += 1
+        return matches
+
+    def fuzzy(self, name, max_distance=2, limit=10):
+        """
+        Returns up to limit (distance, name) pairs of the names within max_distance edits of name,
+        from the closest (and then from the best ranked).
+        """
+        name = name.lower()
+
+        # Candidates are the names sharing the most trigrams, the rarest trigrams are read first
+        shared = Counter()
+        budget = POSTINGS_BUDGET
+        for gram in sorted(set(trigrams(name)), key=lambda gram: len(self.grams.get(gram, []))):
+            postings = self.grams.get(gram, [])
+            if len(postings) > budget:
+                break
+            budget -= len(postings)
+            shared.update(postings)
+
+        matches = []
+        for position, _ in shared.most_common(MAX_CANDIDATES):
+            key = self.keys[position]
+            distance = edit_distance(name, key, max_distance)
+            if distance is not None:
+                matches.append((distance, -self.ranks[self.ids[key][0]], key))
+        matches.sort()
+        return [(distance, key) for distance, _, key in matches[:limit]]
+
+    def resolve(self, name, max_distance=2):
+        """
+        Returns the person id of the best ranked person with the given name, never asking.
+        If there is no such name, the closest name (within max_distance edits) is used.
+        Returns None if nothing matches.
+        """
+        person_ids = self.ids.get(name.lower())
+        if person_ids:
+            return person_ids[0]
+        matches = self.fuzzy(name, max_distance, limit=1)
+        if matches:
+            return self.ids[matches[0][1]][0]
+        return None
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def edit_distance(a, b, max_distance):
+    """
+    Returns the Levenshtein distance between a and b, or None if it is greater than max_distance.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        current = [i]
+        for j, char_b in enumerate(b, start=1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            ))
+        # The distance can only grow from the minimum of a row
+        if min(current) > max_distance:
+            return None
+        previous = current
+
+    return previous[-1] if previous[-1] <= max_distance else None
@@ -0,0 +1,196 @@
+import json
+import multiprocessing
+import os
+import signal
+import socketserver
+import sys
+import threading
+import time
+
+import degrees
+from batch import resolve
+
+USAGE = "Usage: python server.py [directory] [--workers=N] [--socket=PATH] [--names]"
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    options = dict(arg[2:].partition("=")[::2] for arg in sys.argv[1:] if arg.startswith("--"))
+    if len(args) > 1 or any(option not in ("workers", "socket", "names") for option in options):
+        sys.exit(USAGE)
+    directory = args[0] if len(args) == 1 else "large"
+    try:
+        workers = int(options.get("workers", os.cpu_count()))
+    except ValueError:
+        sys.exit(USAGE)
+
+    server = QueryServer(directory, workers, "names" in options)
+    print(f"Serving with {workers} workers.", file=sys.stderr)
+    try:
+        if "socket" in options:
+            server.serve_socket(options["socket"])
+        else:
+            server.serve_stream(sys.stdin, sys.stdout)
+    finally:
+        server.close()
+
+
+class QueryServer():
+    """
+    Answers shortest_path requests with a pool of worker processes.
+
+    The protocol is line based: each request is a JSON object
+    {"id": ..., "source": ..., "target": ..., "bidirectional": false},
+    where source and target are person ids or names, and each response is a JSON object
+    {"id": ..., "path": ..., "degrees": ..., "latency": ..., "service_time": ..., "queue_depth": ...}
+    (or {"id": ..., "error": ...}). Responses are written as soon as they are ready,
+    so they may be out of order.
+
+    latency is the number of seconds from the reception of the request to its response,
+    service_time the part of it spent searching, and queue_depth the number of requests
+    still waiting or in progress when the response is sent.
+    """
+
+    def __init__(self, directory, workers, names=False):
+        """
+        If names is True, the names are resolved with the name index.
+        """
+        # Compiled (if needed) once here, so that the workers only map the snapshot file
+        # and share its pages
+        degrees.load_data(directory, snapshot=True)
+        if names:
+            degrees.load_name_index(directory)
+        self.pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(directory, names))
+        self.lock = threading.Lock()
+        self.pending = 0
+
+    def submit(self, line, reply):
+        """
+        Submits a request line. reply is called with the response dictionary.
+        """
+        received = time.perf_counter()
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+        except ValueError as e:
+            reply({"error": f"invalid request: {e}"})
+            return
+
+        with self.lock:
+            self.pending += 1
+
+        def done(response):
+            with self.lock:
+                self.pending -= 1
+                response["queue_depth"] = self.pending
+            response["latency"] = time.perf_counter() - received
+            reply(response)
+
+        def failed(error):
+            done({"id": request.get("id"), "error": str(error)})
+
+        self.pool.apply_async(_handle, (request,), callback=done, error_callback=failed)
+
+    def serve_stream(self, requests, responses):
+        """
+        Serves the request lines of the requests stream, writing the responses to the responses stream.
+        Returns when the requests stream ends and all its requests are answered.
+        """
+        write_lock = threading.Lock()
+        answered = threading.Condition()
+        unanswered = 0
+
+        def reply(response):
+            nonlocal unanswered
+            with write_lock:
+                responses.write(json.dumps(response) + "\n")
+                responses.flush()
+            with answered:
+                unanswered -= 1
+                answered.notify_all()
+
+        for line in requests:
+            if line.strip():
+                with answered:
+                    unanswered += 1
+                self.submit(line, reply)
+
+        with answered:
+            answered.wait_for(lambda: unanswered == 0)
+
+    def serve_socket(self, path):
+        """
+        Serves the connections to a Unix socket at path, each connection uses the line based protocol.
+        """
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                server.serve_stream(
+                    (line.decode("utf-8") for line in self.rfile),
+                    _SocketWriter(self.wfile)
+                )
+
+        if os.path.exists(path):
+            os.unlink(path)
+        with socketserver.ThreadingUnixStreamServer(path, Handler) as unix_server:
+            try:
+                unix_server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+        os.unlink(path)
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+
+class _SocketWriter():
+    """
+    Text interface over the binary stream of a socket connection.
+    """
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def write(self, text):
+        self.wfile.write(text.encode("utf-8"))
+
+    def flush(self):
+        self.wfile.flush()
+
+
+def _init_worker(directory, names):
+    # Interrupts are handled by the main process, which shuts down the pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    degrees.load_data(directory, snapshot=True)
+    if names:
+        degrees.load_name_index(directory)
+
+
+def _handle(request):
+    """
+    Answers a request inside a worker process.
+    """
+    start = time.perf_counter()
+    response = {"id": request.get("id")}
+
+    source, target = request.get("source"), request.get("target")
+    if not isinstance(source, str) or not isinstance(target, str):
+        response["error"] = "source and target are required"
+        return response
+    source_id, target_id = resolve(source), resolve(target)
+    if source_id is None or target_id is None:
+        response["error"] = f"person not found: {source if source_id is None else target}"
+        return response
+
+    path = degrees.shortest_path(source_id, target_id, bool(request.get("bidirectional", False)))
+    response["path"] = path
+    response["degrees"] = None if path is None else len(path)
+    response["service_time"] = time.perf_counter() - start
+    return response
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+import csv
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+
+from graph import CompactGraph, INDEX_TYPE
+
+# Default name of the snapshot file, stored next to the CSV files
+SNAPSHOT_NAME = "graph.snapshot"
+SOURCE_NAMES = ("people.csv", "movies.csv", "stars.csv")
+
+MAGIC = b"DEGSNAP1"
+
+# Sections stored in the file, in order.
+# Index arrays are int32, string tables are an int64 offsets array followed by a UTF-8 blob
+INDEX_SECTIONS = (
+    "person_offsets", "person_movies", "movie_offsets", "movie_people",
+    "person_id_order", "person_name_order", "movie_id_order"
+)
+STRING_SECTIONS = (
+    "person_ids", "person_names", "person_births", "movie_ids", "movie_titles", "movie_years"
+)
+
+# Magic, then (offset, length in bytes) of every section
+HEADER = struct.Struct("<8s" + "qq" * (len(INDEX_SECTIONS) + 2 * len(STRING_SECTIONS)))
+
+
+def snapshot_path(directory):
+    return os.path.join(directory, SNAPSHOT_NAME)
+
+
+def is_stale(directory):
+    """
+    Returns True if the snapshot of directory is missing or older than any of the CSV files.
+    """
+    path = snapshot_path(directory)
+    if not os.path.exists(path):
+        return True
+    snapshot_time = os.path.getmtime(path)
+    return any(os.path.getmtime(os.path.join(directory, name)) > snapshot_time for name in SOURCE_NAMES)
+
+
+def compile_snapshot(directory):
+    """
+    Parses the CSV files of directory and writes their graph into the binary snapshot file.
+    """
+    person_ids, person_names, person_births = [], [], []
+    with open(f"{directory}/people.csv", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            person_ids.append(row["id"])
+            person_names.append(row["name"])
+            person_births.append(row["birth"])
+
+    movie_ids, movie_titles, movie_years = [], [], []
+    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            movie_ids.append(row["id"])
+            movie_titles.append(row["title"])
+            movie_years.append(row["year"])
+
+    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+        graph = CompactGraph.build(
+            person_ids, movie_ids, ((row["person_id"], row["movie_id"]) for row in csv.DictReader(f))
+        )
+
+    # Orders of the indexes sorted by key, used to look up ids and names with a binary search
+    sections = {
+        "person_offsets": graph.person_offsets,
+        "person_movies": graph.person_movies,
+        "movie_offsets": graph.movie_offsets,
+        "movie_people": graph.movie_people,
+        "person_id_order": _order(person_ids),
+        "person_name_order": _order([name.lower() for name in person_names]),
+        "movie_id_order": _order(movie_ids),
+    }
+    strings = {
+        "person_ids": person_ids,
+        "person_names": person_names,
+        "person_births": person_births,
+        "movie_ids": movie_ids,
+        "movie_titles": movie_titles,
+        "movie_years": movie_years,
+    }
+
+    # Write into a temporary file first, so that readers never see a partial snapshot
+    path = snapshot_path(directory)
+    with open(path + ".tmp", "wb") as f:
+        f.write(bytes(HEADER.size))
+        layout = []
+        for name in INDEX_SECTIONS:
+            layout += _write_section(f, sections[name].tobytes())
+        for name in STRING_SECTIONS:
+            offsets, blob = _encode_strings(strings[name])
+            layout += _write_section(f, offsets.tobytes())
+            layout += _write_section(f, blob)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, *layout))
+    os.replace(path + ".tmp", path)
+
+
+def open_snapshot(directory):
+    """
+    Returns the Snapshot of directory, compiling it first if missing or stale.
+    """
+    if is_stale(directory):
+        compile_snapshot(directory)
+    return Snapshot(snapshot_path(directory))
+
+
+class Snapshot():
+    """
+    Memory-mapped snapshot.
+    Nothing is parsed when opened, the arrays are views over the mapped pages
+    (shared between all the processes mapping the same file).
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self.mmap)
+
+        fields = HEADER.unpack_from(buffer)
+        if fields[0] != MAGIC:
+            raise Exception(f"{path} is not a degrees snapshot")
+        layout = iter(zip(fields[1::2], fields[2::2]))
+
+        sections = {}
+        for name in INDEX_SECTIONS:
+            offset, length = next(layout)
+            sections[name] = buffer[offset:offset + length].cast(INDEX_TYPE)
+        for name in STRING_SECTIONS:
+            offset, length = next(layout)
+            offsets = buffer[offset:offset + length].cast("q")
+            offset, length = next(layout)
+            sections[name] = StringTable(offsets, buffer[offset:offset + length])
+
+        self.person_names = sections["person_names"]
+        self.person_births = sections["person_births"]
+        self.movie_titles = sections["movie_titles"]
+        self.movie_years = sections["movie_years"]
+        self.graph = CompactGraph(
+            sections["person_ids"], sections["movie_ids"],
+            sections["person_offsets"], sections["person_movies"],
+            sections["movie_offsets"], sections["movie_people"],
+            person_indexes=SortedIndex(sections["person_ids"], sections["person_id_order"]),
+            movie_indexes=SortedIndex(sections["movie_ids"], sections["movie_id_order"])
+        )
+        self.name_order = sections["person_name_order"]
+
+        # Views with the same shape of the degrees.py dictionaries
+        self.people = RecordView(self.graph.person_ids, self.graph.person_indexes,
+                                 name=self.person_names, birth=self.person_births)
+        self.movies = RecordView(self.graph.movie_ids, self.graph.movie_indexes,
+                                 title=self.movie_titles, year=self.movie_years)
+        self.names = NameView(self)
+
+
+class StringTable():
+    """
+    Read-only sequence of strings decoded on access from an offsets array and a UTF-8 blob.
+    """
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if not 0 <= i < len(self):
+            raise IndexError("string table index out of range")
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+
+class SortedIndex(Mapping):
+    """
+    Maps the strings of a StringTable to their index, with a binary search over a sorted order.
+    """
+
+    def __init__(self, table, order):
+        self.table = table
+        self.order = order
+
+    def __getitem__(self, key):
+        k = bisect_left(range(len(self.order)), key, key=lambda k: self.table[self.order[k]])
+        if k < len(self.order) and self.table[self.order[k]] == key:
+            return self.order[k]
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self.table[i] for i in range(len(self.table)))
+
+    def __len__(self):
+        return len(self.table)
+
+
+class RecordView(Mapping):
+    """
+    Maps ids to dictionaries of fields read from the snapshot, like the `people` and `movies` of degrees.py.
+    """
+
+    def __init__(self, ids, indexes, **fields):
+        self.ids = ids
+        self.indexes = indexes
+        self.fields = fields
+
+    def __getitem__(self, key):
+        i = self.indexes[key]
+        return {field: table[i] for field, table in self.fields.items()}
+
+    def __iter__(self):
+        return iter(self.indexes)
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class NameView(Mapping):
+    """
+    Maps lowercase names to the set of corresponding person ids, like the `names` of degrees.py.
+    """
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+
+    def _name(self, k):
+        return self.snapshot.person_names[self.snapshot.name_order[k]].lower()
+
+    def __getitem__(self, key):
+        order = self.snapshot.name_order
+        k = bisect_left(range(len(order)), key, key=self._name)
+        person_ids = set()
+        while k < len(order) and self._name(k) == key:
+            person_ids.add(self.snapshot.graph.person_ids[order[k]])
+            k += 1
+        if not person_ids:
+            raise KeyError(key)
+        return person_ids
+
+    def __iter__(self):
+        previous = None
+        for k in range(len(self.snapshot.name_order)):
+            name = self._name(k)
+            if name != previous:
+                yield name
+            previous = name
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+def _order(keys):
+    return array(INDEX_TYPE, sorted(range(len(keys)), key=keys.__getitem__))
+
+
+def _encode_strings(strings):
+    """
+    Returns the offsets array and the UTF-8 blob of a list of strings.
+    """
+    offsets = array("q", [0])
+    chunks = []
+    for string in strings:
+        encoded = string.encode("utf-8")
+        chunks.append(encoded)
+        offsets.append(offsets[-1] + len(encoded))
+    return offsets, b"".join(chunks)
+
+
+def _write_section(f, data):
+    """
+    Writes data aligned to 8 bytes. Returns its (offset, length).
+    """
+    f.write(bytes(-f.tell() % 8))
+    offset = f.tell()
+    f.write(data)
+    return [offset, len(data)]
@@ -0,0 +1,195 @@
+"""
+Tic Tac Toe Player on bitboards
+
+The board is encoded as two 9 bits integers, the cells of X and the cells of O,
+where the cell (i, j) is the bit i * 3 + j. The functions with the same names of tictactoe.py
+take and return the usual list of lists boards, so this module can replace it in runner.py.
+"""
+
+import math
+
+from tictactoe import X, O, EMPTY, EXACT, LOWER, UPPER, TranspositionTable
+
+FULL = 0b111111111
+
+# Cells of each row, column and diagonal
+WIN_MASKS = (
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100,
+)
+
+# Bit of each move, in the same order of tictactoe.actions
+MOVE_BITS = tuple(((i, j), 1 << (i * 3 + j)) for i in range(3) for j in range(3))
+
+# Shared by all the minimax calls, keyed on the (x, o) pair
+transpositions = TranspositionTable()
+
+
+def from_board(board):
+    """
+    Returns the (x, o) bitboards of a list of lists board.
+    """
+    x = o = 0
+    for (i, j), bit in MOVE_BITS:
+        if board[i][j] == X:
+            x |= bit
+        elif board[i][j] == O:
+            o |= bit
+    return (x, o)
+
+
+def to_board(x, o):
+    """
+    Returns the list of lists board of the (x, o) bitboards.
+    """
+    board = [[EMPTY, EMPTY, EMPTY] for _ in range(3)]
+    for (i, j), bit in MOVE_BITS:
+        if x & bit:
+            board[i][j] = X
+        elif o & bit:
+            board[i][j] = O
+    return board
+
+
+def bits_player(x, o):
+    """
+    Returns True if X has the next turn.
+    """
+    return x.bit_count() == o.bit_count()
+
+
+def bits_winner(x, o):
+    """
+    Returns X or O if it has a complete line, None otherwise.
+    """
+    for mask in WIN_MASKS:
+        if x & mask == mask:
+            return X
+        if o & mask == mask:
+            return O
+    return None
+
+
+def bits_terminal(x, o):
+    return (x | o) == FULL or bits_winner(x, o) is not None
+
+
+def bits_utility(x, o):
+    winner_player = bits_winner(x, o)
+    if winner_player == X:
+        return 1
+    elif winner_player == O:
+        return -1
+    else:
+        return 0
+
+
+def bits_propagate(x, o, alpha, beta, table=None):
+    """
+    Same of tictactoe.propagate on bitboards, the move is returned as its bit.
+    """
+    if table is None:
+        table = transpositions
+
+    if bits_terminal(x, o):
+        return (bits_utility(x, o), None)
+
+    entry = table.get((x, o))
+    if entry is not None:
+        score, move, bound, _ = entry
+        if (bound == EXACT) or (bound == LOWER and score >= beta) or (bound == UPPER and score <= alpha):
+            return (score, move)
+    original_alpha, original_beta = alpha, beta
+
+    # Previous best move first, then the free cells from the lowest bit
+    free = FULL & ~(x | o)
+    moves = [] if entry is None else [entry[1]]
+    while free:
+        bit = free & -free
+        free ^= bit
+        if entry is None or bit != entry[1]:
+            moves.append(bit)
+
+    # Maximize
+    if bits_player(x, o):
+        best_score, best_move = -math.inf, None
+        for bit in moves:
+            score, _ = bits_propagate(x | bit, o, alpha, beta, table)
+            if score > best_score:
+                best_score, best_move = score, bit
+                alpha = max(alpha, best_score)
+                if best_score >= beta: break
+    # Minimize
+    else:
+        best_score, best_move = math.inf, None
+        for bit in moves:
+            score, _ = bits_propagate(x, o | bit, alpha, beta, table)
+            if score < best_score:
+                best_score, best_move = score, bit
+                beta = min(beta, best_score)
+                if alpha >= best_score: break
+
+    if best_score <= original_alpha:
+        table.put((x, o), best_score, best_move, UPPER)
+    elif best_score >= original_beta:
+        table.put((x, o), best_score, best_move, LOWER)
+    else:
+        table.put((x, o), best_score, best_move, EXACT)
+
+    return (best_score, best_move)
+
+
+def bit_move(bit):
+    """
+    Returns the (i, j) move of a bit.
+    """
+    return divmod(bit.bit_length() - 1, 3)
+
+
+def initial_state():
+    return to_board(0, 0)
+
+
+def player(board):
+    return X if bits_player(*from_board(board)) else O
+
+
+def actions(board):
+    x, o = from_board(board)
+    return [move for move, bit in MOVE_BITS if not (x | o) & bit]
+
+
+def result(board, action):
+    x, o = from_board(board)
+    if (not 0 <= action[0] <= 2) or (not 0 <= action[1] <= 2):
+        raise Exception("Invalid move")
+    bit = 1 << (action[0] * 3 + action[1])
+    if (x | o) & bit:
+        raise Exception("Invalid move")
+    return to_board(x | bit, o) if bits_player(x, o) else to_board(x, o | bit)
+
+
+def winner(board):
+    return bits_winner(*from_board(board))
+
+
+def terminal(board):
+    return bits_terminal(*from_board(board))
+
+
+def utility(board):
+    return bits_utility(*from_board(board))
+
+
+def minimax(board):
+    """
+    Returns the optimal action for the current player on the board.
+    """
+    x, o = from_board(board)
+    if bits_terminal(x, o):
+        return None
+    if (x | o) == 0: return (1, 1) # Same opening of tictactoe.minimax
+
+    _, bit = bits_propagate(x, o, -math.inf, math.inf)
+    return bit_move(bit)
@@ -0,0 +1,70 @@
+"""
+Perfect-play book builder
+
+Solves every position reachable from the initial state by retrograde analysis
+and writes the best move of each one into the table read by tictactoe.minimax.
+"""
+
+import sys
+
+import tictactoe as ttt
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python book.py [output]")
+    path = sys.argv[1] if len(sys.argv) == 2 else ttt.BOOK_PATH
+
+    table, positions = build()
+    with open(path, "wb") as f:
+        f.write(table)
+    print(f"{positions} positions solved, {len(table)} bytes written to {path}")
+
+
+def build():
+    """
+    Returns the book table and the number of reachable positions.
+
+    The table has an entry for each of the 3^9 boards (see tictactoe.book_index):
+    the index of the best move in the low 4 bits (NO_MOVE for terminal or unreachable boards)
+    and the minimax score + 1 in the next 2 bits.
+    """
+    # Forward pass: every reachable board, by number of moves played
+    layers = [{ttt.book_index(ttt.initial_state()): ttt.initial_state()}]
+    while True:
+        layer = {}
+        for board in layers[-1].values():
+            if ttt.terminal(board):
+                continue
+            for move in ttt.actions(board):
+                child = ttt.result(board, move)
+                layer[ttt.book_index(child)] = child
+        if not layer:
+            break
+        layers.append(layer)
+
+    # Backward pass: from the last layer, so that the children of a board are always solved first
+    scores = {}
+    table = bytearray([ttt.NO_MOVE]) * 3 ** 9
+    for layer in reversed(layers):
+        for index, board in layer.items():
+            if ttt.terminal(board):
+                scores[index] = ttt.utility(board)
+                table[index] = ((scores[index] + 1) << 4) | ttt.NO_MOVE
+                continue
+
+            pick = max if ttt.player(board) == ttt.X else min
+            # Ties keep the first move in actions order
+            best_score, best_move = None, None
+            for move in ttt.actions(board):
+                score = scores[ttt.book_index(ttt.result(board, move))]
+                if best_score is None or pick(score, best_score) != best_score:
+                    best_score, best_move = score, move
+            scores[index] = best_score
+            table[index] = ((best_score + 1) << 4) | (best_move[0] * 3 + best_move[1])
+
+    return bytes(table), len(scores)
+
+
+if __name__ == "__main__":
+    main()
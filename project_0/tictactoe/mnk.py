@@ -0,0 +1,334 @@
+"""
+Generalised m,n,k game engine
+
+Two players (X first, then O) alternate placing their stones on an m x n board,
+the first with k stones in a row (horizontally, vertically or diagonally) wins.
+3,3,3 is tic tac toe, 15,15,5 is gomoku.
+
+Boards are two bitboards (x, o) where the cell (i, j) is the bit i * n + j.
+"""
+
+import math
+import time
+from collections import Counter
+
+from tictactoe import X, O, EMPTY, EXACT, LOWER, UPPER, TranspositionTable
+
+# Score of a win at the root, wins found deeper score one less for each ply (faster wins are preferred)
+WIN_SCORE = 1000000
+# Scores beyond this are wins or losses, the heuristic evaluations stay below it
+WIN_THRESHOLD = WIN_SCORE - 10000
+
+# Boards with more cells only consider the moves close to the stones already played
+NEIGHBORHOOD_CELLS = 25
+NEIGHBORHOOD = 2
+
+# Nodes searched between two checks of the time budget
+CHECK_EVERY = 64
+
+TABLE_SIZE = 1000000
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class Game():
+    """
+    Rules and precomputed masks of an m,n,k game.
+    """
+
+    def __init__(self, m, n, k):
+        if not 1 <= k <= max(m, n):
+            raise Exception("k must be between 1 and the longest side of the board")
+        self.m, self.n, self.k = m, n, k
+        self.size = m * n
+        self.full = (1 << self.size) - 1
+
+        # Mask of every run of k cells, and the runs through each cell
+        self.lines = []
+        self.lines_through = [[] for _ in range(self.size)]
+        for i in range(m):
+            for j in range(n):
+                for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    cells = [(i + di * step, j + dj * step) for step in range(k)]
+                    if all(0 <= ci < m and 0 <= cj < n for ci, cj in cells):
+                        mask = 0
+                        for ci, cj in cells:
+                            mask |= 1 << (ci * n + cj)
+                        self.lines.append(mask)
+                        for ci, cj in cells:
+                            self.lines_through[ci * n + cj].append(mask)
+
+        # Value of a line holding only the stones of one player, by number of stones
+        self.weights = [0] + [4 ** count for count in range(1, k)]
+
+        # Cells from the center outwards, the static move order
+        center_i, center_j = (m - 1) / 2, (n - 1) / 2
+        self.center_order = sorted(
+            range(self.size),
+            key=lambda cell: (abs(cell // n - center_i) + abs(cell % n - center_j), cell)
+        )
+
+        # Cells within NEIGHBORHOOD of each cell
+        self.near = []
+        for cell in range(self.size):
+            i, j = divmod(cell, n)
+            mask = 0
+            for ni in range(max(0, i - NEIGHBORHOOD), min(m, i + NEIGHBORHOOD + 1)):
+                for nj in range(max(0, j - NEIGHBORHOOD), min(n, j + NEIGHBORHOOD + 1)):
+                    mask |= 1 << (ni * n + nj)
+            self.near.append(mask)
+
+    def x_to_move(self, x, o):
+        return x.bit_count() == o.bit_count()
+
+    def play(self, x, o, cell):
+        """
+        Returns the (x, o) bitboards after the player to move places a stone on cell.
+        """
+        bit = 1 << cell
+        if (x | o) & bit:
+            raise Exception("Invalid move")
+        return (x | bit, o) if self.x_to_move(x, o) else (x, o | bit)
+
+    def wins(self, stones, cell):
+        """
+        Returns True if stones have a complete line through cell.
+        """
+        for line in self.lines_through[cell]:
+            if stones & line == line:
+                return True
+        return False
+
+    def winner(self, x, o):
+        """
+        Returns X or O if it has a complete line, None otherwise.
+        """
+        for line in self.lines:
+            if x & line == line:
+                return X
+            if o & line == line:
+                return O
+        return None
+
+    def terminal(self, x, o):
+        return (x | o) == self.full or self.winner(x, o) is not None
+
+    def evaluate(self, x, o):
+        """
+        Heuristic score of a position for X: lines still winnable by only one player
+        count more the more stones they hold.
+        """
+        weights = self.weights
+        score = 0
+        for line in self.lines:
+            x_line, o_line = x & line, o & line
+            if x_line and not o_line:
+                score += weights[x_line.bit_count()]
+            elif o_line and not x_line:
+                score -= weights[o_line.bit_count()]
+        return max(-WIN_THRESHOLD + 1, min(WIN_THRESHOLD - 1, score))
+
+    def candidates(self, x, o):
+        """
+        Returns the cells worth playing, in static order.
+        On large boards, only the free cells close to the stones played are considered.
+        """
+        occupied = x | o
+        if self.size > NEIGHBORHOOD_CELLS and occupied:
+            allowed = 0
+            stones = occupied
+            while stones:
+                bit = stones & -stones
+                stones ^= bit
+                allowed |= self.near[bit.bit_length() - 1]
+            allowed &= ~occupied
+            if not allowed:
+                allowed = self.full & ~occupied
+        else:
+            allowed = self.full & ~occupied
+        return [cell for cell in self.center_order if allowed >> cell & 1]
+
+    def from_board(self, board):
+        """
+        Returns the (x, o) bitboards of a list of lists board.
+        """
+        x = o = 0
+        for i, row in enumerate(board):
+            for j, cell in enumerate(row):
+                if cell == X:
+                    x |= 1 << (i * self.n + j)
+                elif cell == O:
+                    o |= 1 << (i * self.n + j)
+        return (x, o)
+
+    def to_board(self, x, o):
+        """
+        Returns the list of lists board of the (x, o) bitboards.
+        """
+        return [
+            [X if x >> (i * self.n + j) & 1 else O if o >> (i * self.n + j) & 1 else EMPTY for j in range(self.n)]
+            for i in range(self.m)
+        ]
+
+    def move(self, cell):
+        return divmod(cell, self.n)
+
+    def cell(self, move):
+        return move[0] * self.n + move[1]
+
+
+class Engine():
+    """
+    Iterative deepening alpha-beta search for an m,n,k game, with a move-time budget.
+
+    Positions beyond the depth limit are scored with Game.evaluate. Moves are ordered
+    by the transposition table best move, then by the history of the moves causing cutoffs,
+    then from the center. stats counts the searched nodes, the cutoffs and the table probes and hits.
+    """
+
+    def __init__(self, game, table_size=TABLE_SIZE):
+        self.game = game
+        self.table = TranspositionTable(table_size)
+        self.history = [0] * game.size
+        self.stats = Counter()
+        self.deadline = None
+
+    def search(self, x, o, time_budget=None, max_depth=None):
+        """
+        Searches the best move for the player to move, deepening one ply at a time until max_depth
+        (all the free cells by default), a forced result or the end of time_budget (seconds).
+        Returns (score, move, depth) where move is (i, j) and depth the deepest completed search.
+        """
+        game = self.game
+        if game.terminal(x, o):
+            raise Exception("Game is over")
+        free = game.size - (x | o).bit_count()
+        max_depth = free if max_depth is None else min(max_depth, free)
+
+        self.deadline = None if time_budget is None else time.perf_counter() + time_budget
+        best = None
+        try:
+            for depth in range(1, max_depth + 1):
+                score, cell = self.propagate(x, o, depth, -math.inf, math.inf, 0, None)
+                best = (score, game.move(cell), depth)
+                # A forced result does not change with more depth
+                if abs(score) >= WIN_THRESHOLD:
+                    break
+        except SearchTimeout:
+            pass
+        finally:
+            self.deadline = None
+
+        # Not even the first ply fit in the budget, the statically best move is played
+        if best is None:
+            best = (game.evaluate(x, o), game.move(game.candidates(x, o)[0]), 0)
+        return best
+
+    def best_move(self, board, time_budget=None, max_depth=None):
+        """
+        Returns the move (i, j) of the search on a list of lists board.
+        """
+        return self.search(*self.game.from_board(board), time_budget, max_depth)[1]
+
+    def propagate(self, x, o, depth, alpha, beta, ply, last):
+        """
+        Executes depth-limited minimax with alpha-beta pruning returning the tuple (score, cell)
+
+        alpha keeps track of the best maximized score
+        beta keeps track of the best minimized score
+        ply is the distance from the root, last the cell of the previous move (None at the root)
+        """
+        game = self.game
+        self.stats["nodes"] += 1
+        if (self.deadline is not None and self.stats["nodes"] % CHECK_EVERY == 0
+                and time.perf_counter() > self.deadline):
+            raise SearchTimeout()
+
+        x_to_move = game.x_to_move(x, o)
+
+        # Only the previous move can have completed a line
+        if last is not None:
+            if game.wins(o if x_to_move else x, last):
+                return (-(WIN_SCORE - ply) if x_to_move else WIN_SCORE - ply, None)
+            if (x | o) == game.full:
+                return (0, None)
+        if depth == 0:
+            return (game.evaluate(x, o), None)
+
+        # The stored score can be used if deep enough and exact or with its bound outside the window
+        self.stats["probes"] += 1
+        entry = self.table.get((x, o))
+        stored_move = None
+        if entry is not None:
+            score, stored_move, bound, stored_depth = entry
+            score = _from_table(score, ply)
+            if stored_depth >= depth and (
+                (bound == EXACT) or (bound == LOWER and score >= beta) or (bound == UPPER and score <= alpha)
+            ):
+                self.stats["hits"] += 1
+                return (score, stored_move)
+        original_alpha, original_beta = alpha, beta
+
+        moves = game.candidates(x, o)
+        moves.sort(key=lambda cell: -self.history[cell])
+        if stored_move in moves:
+            moves.remove(stored_move)
+            moves.insert(0, stored_move)
+
+        # Maximize
+        if x_to_move:
+            best_score, best_move = -math.inf, None
+            for cell in moves:
+                score, _ = self.propagate(x | 1 << cell, o, depth - 1, alpha, beta, ply + 1, cell)
+                if score > best_score:
+                    best_score, best_move = score, cell
+                    alpha = max(alpha, best_score)
+                    if best_score >= beta:
+                        self._cutoff(cell, depth)
+                        break
+        # Minimize
+        else:
+            best_score, best_move = math.inf, None
+            for cell in moves:
+                score, _ = self.propagate(x, o | 1 << cell, depth - 1, alpha, beta, ply + 1, cell)
+                if score < best_score:
+                    best_score, best_move = score, cell
+                    beta = min(beta, best_score)
+                    if alpha >= best_score:
+                        self._cutoff(cell, depth)
+                        break
+
+        if best_score <= original_alpha:
+            bound = UPPER
+        elif best_score >= original_beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.table.put((x, o), _to_table(best_score, ply), best_move, bound, depth)
+
+        return (best_score, best_move)
+
+    def _cutoff(self, cell, depth):
+        self.stats["cutoffs"] += 1
+        self.history[cell] += depth * depth
+
+
+def _to_table(score, ply):
+    """
+    Win scores are stored relative to the position, as their distance from the root changes.
+    """
+    if score >= WIN_THRESHOLD:
+        return score + ply
+    if score <= -WIN_THRESHOLD:
+        return score - ply
+    return score
+
+
+def _from_table(score, ply):
+    if score >= WIN_THRESHOLD:
+        return score - ply
+    if score <= -WIN_THRESHOLD:
+        return score + ply
+    return score
@@ -0,0 +1,167 @@
+"""
+Parallel root splitting for the m,n,k engine
+
+The first root move (the eldest brother) is searched alone to establish a bound,
+then the other root moves are searched by a pool of processes, Young Brothers Wait style.
+The workers share the best root score found so far through a shared value, which they use
+as the alpha-beta window of their next root moves.
+"""
+
+import math
+import multiprocessing
+import os
+import sys
+import time
+
+from mnk import Game, Engine, WIN_THRESHOLD
+
+USAGE = "Usage: python parallel.py [m n k depth]"
+
+
+def main():
+    if len(sys.argv) not in (1, 5):
+        sys.exit(USAGE)
+    try:
+        m, n, k, depth = [int(arg) for arg in sys.argv[1:]] if len(sys.argv) == 5 else (6, 6, 4, 6)
+    except ValueError:
+        sys.exit(USAGE)
+
+    # A few central stones, so that the position is not trivially symmetric
+    game = Game(m, n, k)
+    x = o = 0
+    for cell in game.center_order[:2]:
+        x, o = game.play(x, o, cell)
+
+    start = time.perf_counter()
+    score, cell = Engine(game).propagate(x, o, depth, -math.inf, math.inf, 0, None)
+    sequential = time.perf_counter() - start
+    print(f"{m},{n},{k} depth {depth}, sequential: score {score}, move {game.move(cell)}, {sequential:.2f}s")
+
+    for workers in range(1, os.cpu_count() + 1):
+        with ParallelEngine(m, n, k, workers) as engine:
+            start = time.perf_counter()
+            score, move = engine.search_depth(x, o, depth)
+            elapsed = time.perf_counter() - start
+        print(f"    {workers} workers: score {score}, move {move}, {elapsed:.2f}s, "
+              f"speedup {sequential / elapsed:.2f}")
+
+
+class ParallelEngine():
+    """
+    Fixed-depth and iterative deepening search of an m,n,k game, splitting the root moves among workers.
+
+    For a given position and depth, the result does not depend on the number of workers
+    nor on their timing: every root move that can be the best is searched with a window that
+    makes its score exact, and ties are broken by the root move order.
+    """
+
+    def __init__(self, m, n, k, workers=None):
+        self.game = Game(m, n, k)
+        self.engine = Engine(self.game)
+        self.bound = multiprocessing.Value("d", 0.0)
+        self.pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(m, n, k, self.bound))
+        self.generation = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+    def search_depth(self, x, o, depth):
+        """
+        Searches the position to a fixed depth. Returns (score, move) where move is (i, j).
+        """
+        game = self.game
+        if game.terminal(x, o) or depth < 1:
+            raise Exception("Nothing to search")
+        x_to_move = game.x_to_move(x, o)
+
+        # Tables are cleared at each search, so that no score of a different depth leaks in
+        self.generation += 1
+        self.engine.table.clear()
+
+        moves = game.candidates(x, o)
+        eldest = moves[0]
+        scores = {eldest: _search_move(self.engine, x, o, eldest, depth, -math.inf, math.inf)}
+        self.bound.value = scores[eldest]
+
+        tasks = [(self.generation, x, o, cell, depth) for cell in moves[1:]]
+        for cell, score in zip(moves[1:], self.pool.imap(_worker_search, tasks)):
+            scores[cell] = score
+
+        pick = max if x_to_move else min
+        best = pick(scores[cell] for cell in moves)
+        return (best, game.move(next(cell for cell in moves if scores[cell] == best)))
+
+    def search(self, x, o, time_budget=None, max_depth=None):
+        """
+        Deepens one ply at a time like Engine.search, the time budget is checked between the depths.
+        Returns (score, move, depth).
+        """
+        free = self.game.size - (x | o).bit_count()
+        max_depth = free if max_depth is None else min(max_depth, free)
+        deadline = None if time_budget is None else time.perf_counter() + time_budget
+
+        best = None
+        for depth in range(1, max_depth + 1):
+            score, move = self.search_depth(x, o, depth)
+            best = (score, move, depth)
+            if abs(score) >= WIN_THRESHOLD or (deadline is not None and time.perf_counter() > deadline):
+                break
+        return best
+
+
+def _search_move(engine, x, o, cell, depth, alpha, beta):
+    """
+    Returns the score of the root move cell.
+    """
+    child_x, child_o = engine.game.play(x, o, cell)
+    score, _ = engine.propagate(child_x, child_o, depth - 1, alpha, beta, 1, cell)
+    return score
+
+
+# State of the worker processes
+worker_engine = None
+worker_bound = None
+worker_generation = None
+
+
+def _init_worker(m, n, k, bound):
+    global worker_engine, worker_bound
+    worker_engine = Engine(Game(m, n, k))
+    worker_bound = bound
+
+
+def _worker_search(task):
+    """
+    Searches a root move inside a worker process, sharing the best root score found.
+    """
+    global worker_generation
+
+    generation, x, o, cell, depth = task
+    if generation != worker_generation:
+        worker_engine.table.clear()
+        worker_generation = generation
+
+    # Scores are integers: a window one below (above) the best score makes the ties exact,
+    # moves that fail low (high) are surely worse than the best
+    x_to_move = worker_engine.game.x_to_move(x, o)
+    bound = worker_bound.value
+    if x_to_move:
+        score = _search_move(worker_engine, x, o, cell, depth, bound - 1, math.inf)
+    else:
+        score = _search_move(worker_engine, x, o, cell, depth, -math.inf, bound + 1)
+
+    with worker_bound.get_lock():
+        if (x_to_move and score > worker_bound.value) or (not x_to_move and score < worker_bound.value):
+            worker_bound.value = score
+    return score
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ import sys
 import time
 
 import tictactoe as ttt
+from worker import AIWorker
 
 pygame.init()
 size = width, height = 600, 400
@@ -19,14 +20,20 @@ moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
 user = None
 board = ttt.initial_state()
-ai_turn = False
+worker = AIWorker()
+ai_move = None
+ai_started = None
+pondered = None
 
 while True:
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            worker.close()
             sys.exit()
 
+    worker.poll()
+
     screen.fill(black)
 
     # Let user choose a player.
@@ -108,15 +115,19 @@ while True:
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Check for AI move, computed in the background while the board keeps being drawn
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if ai_move is None:
+                ai_move = worker.request(board)
+                ai_started = time.time()
+            elif ai_move.done() and time.time() - ai_started >= 0.5:
+                board = ttt.result(board, ai_move.result())
+                ai_move = None
+
+        # Think about the answers to the user moves during their turn
+        if user == player and not game_over and pondered != board:
+            worker.ponder(board)
+            pondered = board
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
@@ -141,6 +152,8 @@ while True:
                     time.sleep(0.2)
                     user = None
                     board = ttt.initial_state()
-                    ai_turn = False
+                    worker.cancel(restart=True)
+                    ai_move = None
+                    pondered = None
 
     pygame.display.flip()
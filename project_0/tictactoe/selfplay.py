@@ -0,0 +1,174 @@
+"""
+Self-play harness
+
+Plays games between the search engines (or against a random player) from the initial state
+and records, for each move, the time taken and the searched nodes, cutoffs and table probes and hits.
+The summary is printed, the moves can be written as CSV and the whole report as JSON.
+"""
+
+import csv
+import json
+import math
+import random
+import sys
+import time
+
+import tictactoe as ttt
+from mnk import Game, Engine
+
+PLAYERS = ("minimax", "mnk", "random")
+USAGE = f"Usage: python selfplay.py games [x_player] [o_player] [--seed=n] [--csv=path] [--json=path] (players: {', '.join(PLAYERS)})"
+COUNTERS = ("nodes", "cutoffs", "probes", "hits")
+FIELDS = ("game", "ply", "player", "engine", "move", "latency") + COUNTERS
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    options = dict(arg[2:].split("=", 1) for arg in sys.argv[1:] if arg.startswith("--") and "=" in arg)
+    if not 1 <= len(args) <= 3 or any(player not in PLAYERS for player in args[1:]):
+        sys.exit(USAGE)
+    try:
+        games = int(args[0])
+        seed = int(options.get("seed", 0))
+    except ValueError:
+        sys.exit(USAGE)
+    x_player = args[1] if len(args) > 1 else "minimax"
+    o_player = args[2] if len(args) > 2 else "random"
+
+    report = play(games, x_player, o_player, seed)
+    for line in summary_lines(report):
+        print(line)
+
+    if "csv" in options:
+        with open(options["csv"], "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(report["moves"])
+    if "json" in options:
+        with open(options["json"], "w") as f:
+            json.dump(report, f, indent=2)
+
+
+class MinimaxPlayer():
+    """
+    tictactoe.propagate, with its shared transposition table (the opening book is not used).
+    """
+
+    name = "minimax"
+
+    def __init__(self, rng):
+        ttt.transpositions.clear()
+
+    def move(self, board):
+        before = ttt.stats.copy()
+        _, move = ttt.propagate(board, -math.inf, math.inf)
+        return (move, {counter: ttt.stats[counter] - before[counter] for counter in COUNTERS})
+
+
+class MnkPlayer():
+    """
+    The m,n,k engine on the 3,3,3 board, searching to the end of the game.
+    """
+
+    name = "mnk"
+
+    def __init__(self, rng):
+        self.engine = Engine(Game(3, 3, 3))
+
+    def move(self, board):
+        before = self.engine.stats.copy()
+        _, move, _ = self.engine.search(*self.engine.game.from_board(board))
+        return (move, {counter: self.engine.stats[counter] - before[counter] for counter in COUNTERS})
+
+
+class RandomPlayer():
+    name = "random"
+
+    def __init__(self, rng):
+        self.rng = rng
+
+    def move(self, board):
+        return (self.rng.choice(ttt.actions(board)), dict.fromkeys(COUNTERS, 0))
+
+
+def make_player(name, rng):
+    return {"minimax": MinimaxPlayer, "mnk": MnkPlayer, "random": RandomPlayer}[name](rng)
+
+
+def play(games, x_player, o_player, seed=0):
+    """
+    Plays the games and returns the report: the settings, the results and the list of moves.
+    The engines keep their tables between the games, as in a session of runner.py.
+    """
+    rng = random.Random(seed)
+    players = {ttt.X: make_player(x_player, rng)}
+    # The same engine on both sides shares its tables
+    players[ttt.O] = players[ttt.X] if o_player == x_player else make_player(o_player, rng)
+
+    results = {ttt.X: 0, ttt.O: 0, "tie": 0}
+    moves = []
+    for game in range(games):
+        board = ttt.initial_state()
+        ply = 0
+        while not ttt.terminal(board):
+            current = ttt.player(board)
+            start = time.perf_counter()
+            move, counters = players[current].move(board)
+            latency = time.perf_counter() - start
+            moves.append({
+                "game": game, "ply": ply, "player": current, "engine": players[current].name,
+                "move": f"{move[0]},{move[1]}", "latency": latency, **counters
+            })
+            board = ttt.result(board, move)
+            ply += 1
+        results[ttt.winner(board) or "tie"] += 1
+
+    return {
+        "games": games, "x_player": x_player, "o_player": o_player, "seed": seed,
+        "results": results, "engines": engine_summaries(moves), "moves": moves
+    }
+
+
+def engine_summaries(moves):
+    """
+    Returns the totals, cache hit rate and latency percentiles of the moves of each search engine.
+    """
+    summaries = {}
+    for engine in sorted({move["engine"] for move in moves} - {RandomPlayer.name}):
+        engine_moves = [move for move in moves if move["engine"] == engine]
+        latencies = sorted(move["latency"] for move in engine_moves)
+        totals = {counter: sum(move[counter] for move in engine_moves) for counter in COUNTERS}
+        summaries[engine] = {
+            "moves": len(engine_moves),
+            **totals,
+            "nodes_per_move": totals["nodes"] / len(engine_moves),
+            "hit_rate": totals["hits"] / totals["probes"] if totals["probes"] else 0,
+            "latency_mean": sum(latencies) / len(latencies),
+            "latency_p50": percentile(latencies, 50),
+            "latency_p95": percentile(latencies, 95),
+            "latency_max": latencies[-1],
+        }
+    return summaries
+
+
+def percentile(values, p):
+    """
+    Returns the p-th percentile of sorted values (nearest rank).
+    """
+    return values[max(0, math.ceil(len(values) * p / 100) - 1)]
+
+
+def summary_lines(report):
+    results = report["results"]
+    yield (f"{report['games']} games, {report['x_player']} (X) vs {report['o_player']} (O): "
+           f"X {results[ttt.X]}, O {results[ttt.O]}, ties {results['tie']}")
+    for engine, summary in report["engines"].items():
+        yield (f"{engine}: {summary['moves']} moves, {summary['nodes_per_move']:.1f} nodes/move, "
+               f"{summary['cutoffs']} cutoffs, hit rate {summary['hit_rate']:.1%}, "
+               f"latency mean {summary['latency_mean'] * 1000:.3f}ms "
+               f"p50 {summary['latency_p50'] * 1000:.3f}ms p95 {summary['latency_p95'] * 1000:.3f}ms "
+               f"max {summary['latency_max'] * 1000:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
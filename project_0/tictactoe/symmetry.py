@@ -0,0 +1,81 @@
+"""
+Board symmetries (rotations and reflections)
+"""
+
+
+class Symmetries():
+    """
+    Symmetries of a rows x cols board, whose cells are given as a flat tuple in row order.
+
+    A square board has 8 symmetries (4 rotations, each optionally reflected),
+    a rectangular one only 4 (identity, vertical and horizontal reflection, half turn).
+    """
+
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+
+        transforms = [
+            lambda i, j: (i, j),
+            lambda i, j: (rows - 1 - i, j),
+            lambda i, j: (i, cols - 1 - j),
+            lambda i, j: (rows - 1 - i, cols - 1 - j),
+        ]
+        if rows == cols:
+            transforms += [
+                lambda i, j: (j, i),
+                lambda i, j: (j, rows - 1 - i),
+                lambda i, j: (cols - 1 - j, i),
+                lambda i, j: (cols - 1 - j, rows - 1 - i),
+            ]
+
+        # forward[s][p] is the position where symmetry s moves the cell at position p
+        self.forward = []
+        # backward[s][q] is the position that symmetry s moves to position q
+        self.backward = []
+        for transform in transforms:
+            forward = [0] * (rows * cols)
+            backward = [0] * (rows * cols)
+            for i in range(rows):
+                for j in range(cols):
+                    ti, tj = transform(i, j)
+                    forward[i * cols + j] = ti * cols + tj
+                    backward[ti * cols + tj] = i * cols + j
+            self.forward.append(forward)
+            self.backward.append(backward)
+
+    def __len__(self):
+        return len(self.forward)
+
+    def transform(self, cells, symmetry):
+        """
+        Returns the cells moved by a symmetry.
+        """
+        return tuple(cells[p] for p in self.backward[symmetry])
+
+    def canonical(self, cells):
+        """
+        Returns the representative of the symmetry class of cells (the smallest of its variants)
+        and the symmetry that maps cells to it.
+        Cells must be comparable values (e.g. integers).
+        """
+        best, best_symmetry = cells, 0
+        for symmetry in range(1, len(self.backward)):
+            variant = self.transform(cells, symmetry)
+            if variant < best:
+                best, best_symmetry = variant, symmetry
+        return (best, best_symmetry)
+
+    def to_canonical(self, move, symmetry):
+        """
+        Maps a move (i, j) of a board to the corresponding move of its transformed board.
+        """
+        position = self.forward[symmetry][move[0] * self.cols + move[1]]
+        return divmod(position, self.cols)
+
+    def from_canonical(self, move, symmetry):
+        """
+        Maps a move (i, j) of a transformed board back to the corresponding move of the original board.
+        """
+        position = self.backward[symmetry][move[0] * self.cols + move[1]]
+        return divmod(position, self.cols)
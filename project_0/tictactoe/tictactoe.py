@@ -3,12 +3,33 @@ Tic Tac Toe Player
 """
 
 import math
+import os
+from collections import Counter, OrderedDict
 from copy import deepcopy
 
+from symmetry import Symmetries
+
 X = "X"
 O = "O"
 EMPTY = None
 
+# Bound types of the transposition table entries
+EXACT = "exact"
+LOWER = "lower"
+UPPER = "upper"
+
+# Default maximum number of entries of the transposition table
+TABLE_SIZE = 100000
+
+# Perfect-play table written by book.py, loaded by the first minimax call
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+# Move index of the book entries without a move
+NO_MOVE = 15
+
+SYMMETRIES = Symmetries(3, 3)
+# Comparable codes of the cells, for the canonical keys
+CELL_CODES = {EMPTY: 0, X: 1, O: 2}
+
 
 def initial_state():
     """
@@ -131,47 +152,204 @@ def utility(board):
         return 0
 
 
-def propagate(board, alpha, beta):
+class TranspositionTable():
+    """
+    Bounded cache of searched positions.
+
+    Each entry stores the score, the best move and the bound type of the score:
+    EXACT if it is the minimax value, LOWER/UPPER if the search has been cut off
+    and the minimax value is greater/less or equal.
+    Depth-limited searches also store the depth searched below the position
+    (infinite for the full searches).
+    When full, the least recently used entry is evicted.
+    """
+
+    def __init__(self, size=TABLE_SIZE):
+        self.size = size
+        self.entries = OrderedDict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """
+        Returns the (score, move, bound, depth) entry of key, None if not stored.
+        """
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, score, move, bound, depth=math.inf):
+        self.entries[key] = (score, move, bound, depth)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+
+# Shared by all the minimax calls, so that the positions already searched are not searched again
+transpositions = TranspositionTable()
+
+# Searched nodes, cutoffs and table probes and hits of propagate, never reset (take differences)
+stats = Counter()
+
+
+def board_key(board):
+    """
+    Returns a hashable key identifying the position of a board.
+    """
+    return tuple(CELL_CODES[cell] for row in board for cell in row)
+
+
+def canonical_key(board):
+    """
+    Returns the key shared by all the symmetric variants of a board (rotations and reflections)
+    and the symmetry that maps the board to it.
+    """
+    return SYMMETRIES.canonical(board_key(board))
+
+
+def propagate(board, alpha, beta, table=None):
     """
     Executes minimax returning the tuple (score, move)
 
     alpha keeps track of the best maximized score
     beta keeps track of the best minimized score
+
+    Positions are cached in table (the shared transpositions table if not given)
+    under their canonical key, so symmetric positions share the same entry.
+    Stored moves refer to the canonical board.
     """
+    if table is None:
+        table = transpositions
+
+    stats["nodes"] += 1
     if terminal(board):
         return (utility(board), None)
 
+    # The stored score can be used if it is exact or if its bound is outside the window
+    key, symmetry = canonical_key(board)
+    stats["probes"] += 1
+    entry = table.get(key)
+    stored_move = None
+    if entry is not None:
+        score, move, bound, _ = entry
+        stored_move = SYMMETRIES.from_canonical(move, symmetry)
+        if (bound == EXACT) or (bound == LOWER and score >= beta) or (bound == UPPER and score <= alpha):
+            stats["hits"] += 1
+            return (score, stored_move)
+
+    # The window is changed while searching, the original one determines the bound of the result
+    original_alpha, original_beta = alpha, beta
+
+    # Moves leading to symmetric positions have the same score, only one of them is searched
+    moves, children = [], set()
+    for move in actions(board):
+        child_key, _ = canonical_key(result(board, move))
+        if child_key not in children:
+            children.add(child_key)
+            moves.append(move)
+
+    # Previous best move first, as it is likely to cause an early cutoff
+    if stored_move in moves:
+        moves.remove(stored_move)
+        moves.insert(0, stored_move)
+    elif stored_move is not None:
+        # The stored move was pruned as symmetric to another one: that one has the same score
+        stored_key, _ = canonical_key(result(board, stored_move))
+        for move in moves:
+            if canonical_key(result(board, move))[0] == stored_key:
+                moves.remove(move)
+                moves.insert(0, move)
+                break
+
     # Maximize
     if player(board) == X:
         best_score, best_move = -math.inf, None
-        for move in actions(board):
-            score, _ = propagate(result(board, move), alpha, beta)
+        for move in moves:
+            score, _ = propagate(result(board, move), alpha, beta, table)
             if max(best_score, score) != best_score:
                 best_score, best_move = score, move
                 alpha = best_score
                 # Stop if the current best of the branch is better than the previously known one (this move is surely better)
-                if best_score >= beta: break
+                if best_score >= beta:
+                    stats["cutoffs"] += 1
+                    break
     # Minimize
     else:
         best_score, best_move = math.inf, None
-        for move in actions(board):
-            score, _ = propagate(result(board, move), alpha, beta)
+        for move in moves:
+            score, _ = propagate(result(board, move), alpha, beta, table)
             if min(best_score, score) != best_score:
                 best_score, best_move = score, move
                 beta = best_score
                 # Stop if the previously known score is better than the current best of this branch (the previous move is surely better)
-                if alpha >= best_score: break
+                if alpha >= best_score:
+                    stats["cutoffs"] += 1
+                    break
+
+    canonical_move = SYMMETRIES.to_canonical(best_move, symmetry)
+    if best_score <= original_alpha:
+        table.put(key, best_score, canonical_move, UPPER)
+    elif best_score >= original_beta:
+        table.put(key, best_score, canonical_move, LOWER)
+    else:
+        table.put(key, best_score, canonical_move, EXACT)
 
     return (best_score, best_move)
 
 
+book = None
+
+
+def book_index(board):
+    """
+    Returns the index of a board in the book: its cells as a base 3 number.
+    """
+    index = 0
+    for row in board:
+        for cell in row:
+            index = index * 3 + CELL_CODES[cell]
+    return index
+
+
+def book_move(board):
+    """
+    Returns the best move of the board according to the book,
+    None if the book has not been built (or has no move for the board).
+    """
+    global book
+
+    if book is None:
+        try:
+            with open(BOOK_PATH, "rb") as f:
+                book = f.read()
+        except FileNotFoundError:
+            book = b""
+        # Truncated or from another format, searched instead
+        if len(book) != 3 ** 9:
+            book = b""
+    if not book:
+        return None
+
+    move = book[book_index(board)] & 0b1111
+    return None if move == NO_MOVE else divmod(move, 3)
+
+
 def minimax(board):
     """
     Returns the optimal action for the current player on the board.
     """
     if empty(board): return (1, 1) # Manually choose the action if first player (to avoid calculating the entire tree)
 
-    # If time complexity is more important than space, it could be worth to save the generated tree instead of computing it every time
+    # Every reachable position is solved in the book, when built
+    move = book_move(board)
+    if move is not None:
+        return move
+
+    # Searched positions are kept in the transposition table between calls
     _, move = propagate(board, -math.inf, math.inf)
     return move
-        
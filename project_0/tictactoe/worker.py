@@ -0,0 +1,177 @@
+"""
+Background computation of the moves of the computer
+
+The searches run in a separate process (a thread where processes cannot be forked),
+so that runner.py keeps drawing while the computer thinks.
+Each request returns a concurrent.futures.Future, resolved by poll() from the render loop.
+"""
+
+import importlib
+import multiprocessing
+import threading
+from concurrent.futures import Future
+
+# The other start methods import the main module again in the new process, and runner.py has no main guard:
+# without fork (Windows), the searches run in a thread instead
+CONTEXT = multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() else None
+
+
+class AIWorker():
+    """
+    Computes the moves of an engine module (with the minimax, actions, result and terminal functions
+    of tictactoe.py) in a background process, one board at a time.
+
+    The process keeps the engine state between the requests, so the transposition table filled
+    while pondering the replies to the moves of the user is reused by the next searches.
+    Answers are cached by board.
+    """
+
+    def __init__(self, engine="tictactoe"):
+        self.engine = importlib.import_module(engine)
+        self.engine_name = engine
+        self.answers = {}
+        # Requests not answered yet (id -> (key, board, future)), in order, the first is the running one
+        self.jobs = {}
+        self.next_id = 0
+        self.sent = None
+        self._start()
+
+    def _start(self):
+        if CONTEXT is None:
+            self.conn, child_conn = multiprocessing.Pipe()
+            self.process = threading.Thread(target=_serve, args=(self.engine_name, child_conn), daemon=True)
+            self.process.start()
+        else:
+            self.conn, child_conn = CONTEXT.Pipe()
+            self.process = CONTEXT.Process(target=_serve, args=(self.engine_name, child_conn), daemon=True)
+            self.process.start()
+            child_conn.close()
+        self.sent = None
+
+    def _stop(self):
+        # A thread cannot be killed, it stops once its search is done and the pipe is found closed
+        if CONTEXT is not None:
+            self.process.terminate()
+            self.process.join()
+        self.conn.close()
+
+    def _restart(self):
+        self._stop()
+        self._start()
+
+    def close(self):
+        self._stop()
+        for _, _, future in self.jobs.values():
+            future.cancel()
+        self.jobs = {}
+
+    def submit(self, board):
+        """
+        Returns the future of the move for board, sharing the answer or request of the same board if any.
+        """
+        self.poll()
+        key = tuple(tuple(row) for row in board)
+        future = Future()
+        if key in self.answers:
+            future.set_result(self.answers[key])
+            return future
+        for job_key, _, job_future in self.jobs.values():
+            if job_key == key:
+                return job_future
+
+        self.jobs[self.next_id] = (key, [list(row) for row in board], future)
+        self.next_id += 1
+        self._dispatch()
+        return future
+
+    def request(self, board):
+        """
+        Returns the future of the move for board, cancelling every other request.
+        """
+        future = self.submit(board)
+        self.cancel(keep=[future])
+        return future
+
+    def ponder(self, board):
+        """
+        Queues the searches of the answers to each move of the opponent on board.
+        """
+        for action in self.engine.actions(board):
+            child = self.engine.result(board, action)
+            if not self.engine.terminal(child):
+                self.submit(child)
+
+    def cancel(self, keep=(), restart=False):
+        """
+        Cancels the requests not answered yet, except the futures in keep.
+        A search already running is let finish and its answer cached, unless restart is True:
+        then the background process is restarted (losing the state of the engine).
+        """
+        for _, _, future in self.jobs.values():
+            if future not in keep:
+                future.cancel()
+        if restart and self.sent is not None and self.jobs[self.sent][2].cancelled():
+            del self.jobs[self.sent]
+            self._restart()
+        self.poll()
+
+    def poll(self):
+        """
+        Resolves the futures of the answers received and drops the cancelled requests not started yet,
+        without blocking.
+        If the background process died, the running request fails with the error
+        and the others are sent to a new process.
+        """
+        while self.sent is not None:
+            try:
+                if not self.conn.poll():
+                    break
+                job_id, move = self.conn.recv()
+            except (EOFError, OSError) as error:
+                _, _, future = self.jobs.pop(self.sent)
+                if not future.cancelled():
+                    future.set_exception(error)
+                self._restart()
+                continue
+            key, _, future = self.jobs.pop(job_id)
+            self.answers[key] = move
+            if not future.cancelled():
+                future.set_result(move)
+            self.sent = None
+
+        for job_id in [job_id for job_id, (_, _, future) in self.jobs.items() if future.cancelled()]:
+            if job_id != self.sent:
+                del self.jobs[job_id]
+        self._dispatch()
+
+    def _dispatch(self):
+        """
+        Sends the next request to the background process if it is idle.
+        """
+        if self.sent is None and self.jobs:
+            job_id = next(iter(self.jobs))
+            try:
+                self.conn.send((job_id, self.jobs[job_id][1]))
+            except OSError:
+                # The process died while idle
+                self._restart()
+                self.conn.send((job_id, self.jobs[job_id][1]))
+            self.sent = job_id
+
+
+def _serve(engine, conn):
+    """
+    Body of the background process: answers the boards received until the pipe is closed.
+    """
+    engine = importlib.import_module(engine)
+    # Closed on errors too, so that a worker thread failing is seen by poll() as a process dying
+    try:
+        while True:
+            try:
+                job_id, board = conn.recv()
+                move = engine.minimax(board)
+                conn.send((job_id, move))
+            except (EOFError, OSError):
+                break
+    finally:
+        conn.close()
@@ -0,0 +1,263 @@
+from logic import Sentence, Symbol, Not, And, Or, Implication, Biconditional, intern
+
+# Terminal nodes
+FALSE, TRUE = 0, 1
+
+# Binary operations of apply
+AND, OR, IMPLIES, IFF = range(4)
+
+# Compiled knowledge bases kept by model_check for the next queries
+CACHE_SIZE = 16
+
+
+class BDD():
+    """Reduced ordered binary decision diagrams, sharing their nodes.
+
+    Node u tests the variable at level var[u] (variables are ordered by level)
+    and continues to low[u] if it is false, to high[u] if it is true.
+    """
+
+    def __init__(self, order=()):
+        self.names = []
+        self.levels = {}
+        # Terminals first, their level is after every variable
+        self.var = [None, None]
+        self.low = [None, None]
+        self.high = [None, None]
+        # Node of each (level, low, high), so that equal diagrams are the same node
+        self.unique = {}
+        # Results of apply and negate, by operation and operands
+        self.cache = {}
+        self.compiled = {}
+        for name in order:
+            self.variable(name)
+
+    def variable(self, name):
+        """Returns the level of a symbol, adding it after the others if new."""
+        if name not in self.levels:
+            self.levels[name] = len(self.names)
+            self.names.append(name)
+        return self.levels[name]
+
+    def level(self, u):
+        return len(self.names) if u <= TRUE else self.var[u]
+
+    def node(self, level, low, high):
+        """Returns the node testing level, without redundant tests nor duplicates."""
+        if low == high:
+            return low
+        key = (level, low, high)
+        if key not in self.unique:
+            self.unique[key] = len(self.var)
+            self.var.append(level)
+            self.low.append(low)
+            self.high.append(high)
+        return self.unique[key]
+
+    def negate(self, u):
+        if u <= TRUE:
+            return TRUE - u
+        key = (None, u)
+        if key not in self.cache:
+            self.cache[key] = self.node(self.var[u], self.negate(self.low[u]), self.negate(self.high[u]))
+        return self.cache[key]
+
+    def apply(self, op, u, v):
+        """Returns the node of the operation between the diagrams u and v."""
+        # Cases decided by one operand
+        if op == AND:
+            if u == FALSE or v == FALSE:
+                return FALSE
+            if u == TRUE or u == v:
+                return v
+            if v == TRUE:
+                return u
+        elif op == OR:
+            if u == TRUE or v == TRUE:
+                return TRUE
+            if u == FALSE or u == v:
+                return v
+            if v == FALSE:
+                return u
+        elif op == IMPLIES:
+            if u == FALSE or v == TRUE or u == v:
+                return TRUE
+            if u == TRUE:
+                return v
+            if v == FALSE:
+                return self.negate(u)
+        else:
+            if u == v:
+                return TRUE
+            if u == TRUE:
+                return v
+            if v == TRUE:
+                return u
+            if u == FALSE:
+                return self.negate(v)
+            if v == FALSE:
+                return self.negate(u)
+
+        # The operands of the symmetric operations are ordered, so both orders share the cache
+        if op != IMPLIES and u > v:
+            u, v = v, u
+        key = (op, u, v)
+        if key not in self.cache:
+            level = min(self.level(u), self.level(v))
+            u_low, u_high = (self.low[u], self.high[u]) if self.level(u) == level else (u, u)
+            v_low, v_high = (self.low[v], self.high[v]) if self.level(v) == level else (v, v)
+            self.cache[key] = self.node(level, self.apply(op, u_low, v_low), self.apply(op, u_high, v_high))
+        return self.cache[key]
+
+    def compile(self, sentence):
+        """Returns the node of sentence."""
+        sentence = intern(sentence)
+        if sentence in self.compiled:
+            return self.compiled[sentence]
+
+        if isinstance(sentence, Symbol):
+            u = self.node(self.variable(sentence.name), FALSE, TRUE)
+        elif isinstance(sentence, Not):
+            u = self.negate(self.compile(sentence.operand))
+        elif isinstance(sentence, And):
+            u = TRUE
+            for conjunct in sentence.conjuncts:
+                u = self.apply(AND, u, self.compile(conjunct))
+        elif isinstance(sentence, Or):
+            u = FALSE
+            for disjunct in sentence.disjuncts:
+                u = self.apply(OR, u, self.compile(disjunct))
+        elif isinstance(sentence, Implication):
+            u = self.apply(IMPLIES, self.compile(sentence.antecedent), self.compile(sentence.consequent))
+        elif isinstance(sentence, Biconditional):
+            u = self.apply(IFF, self.compile(sentence.left), self.compile(sentence.right))
+        else:
+            raise TypeError("must be a logical sentence")
+
+        self.compiled[sentence] = u
+        return u
+
+    def count(self, u, names=None):
+        """Returns the number of models of u over the variables (all by default, else names, which must include u's)."""
+        variables = len(self.names)
+        counts = {FALSE: 0, TRUE: 1}
+
+        def below(w):
+            """Models of w over the variables from its level."""
+            if w not in counts:
+                low, high = self.low[w], self.high[w]
+                counts[w] = (below(low) << (self.level(low) - self.var[w] - 1)) + \
+                            (below(high) << (self.level(high) - self.var[w] - 1))
+            return counts[w]
+
+        total = below(u) << self.level(u)
+        if names is None:
+            return total
+        # The variables not among names are free in u, they double its models
+        return total >> (variables - len(set(names) & set(self.names))) << len(set(names) - set(self.names))
+
+    def forced(self, u):
+        """Returns the variables with the same value in every model of u (name -> value), None if u has no model.
+
+        The edges not leading to FALSE are followed once: a variable can be false (true) if some such edge
+        from its level is low (high), and can be anything if some such edge skips its level.
+        """
+        if u == FALSE:
+            return None
+        variables = len(self.names)
+        values = [[False, False] for _ in range(variables)]
+        # Difference array of the levels skipped
+        skipped = [0] * (variables + 1)
+        skipped[0] += 1
+        skipped[self.level(u)] -= 1
+
+        stack, seen = [u], {u}
+        while stack:
+            w = stack.pop()
+            if w == TRUE:
+                continue
+            level = self.var[w]
+            for value, child in ((False, self.low[w]), (True, self.high[w])):
+                if child != FALSE:
+                    values[level][value] = True
+                    skipped[level + 1] += 1
+                    skipped[self.level(child)] -= 1
+                    if child not in seen:
+                        seen.add(child)
+                        stack.append(child)
+
+        forced = {}
+        free = 0
+        for level in range(variables):
+            free += skipped[level]
+            if not free and values[level][False] != values[level][True]:
+                forced[self.names[level]] = values[level][True]
+        return forced
+
+
+def order(sentence):
+    """Returns the symbols of sentence in order of first appearance: symbols used together stay close."""
+    names = {}
+    seen = set()
+
+    def visit(sentence):
+        if sentence in seen:
+            return
+        seen.add(sentence)
+        if isinstance(sentence, Symbol):
+            names.setdefault(sentence.name, None)
+        elif isinstance(sentence, Not):
+            visit(sentence.operand)
+        elif isinstance(sentence, (And, Or)):
+            for operand in (sentence.conjuncts if isinstance(sentence, And) else sentence.disjuncts):
+                visit(operand)
+        elif isinstance(sentence, Implication):
+            visit(sentence.antecedent)
+            visit(sentence.consequent)
+        elif isinstance(sentence, Biconditional):
+            visit(sentence.left)
+            visit(sentence.right)
+        else:
+            raise TypeError("must be a logical sentence")
+
+    visit(intern(sentence))
+    return list(names)
+
+
+# Diagram, node and forced symbols of the last knowledge bases checked, by interned knowledge base
+compiled_knowledge = {}
+
+
+def compile_knowledge(knowledge):
+    """Returns the diagram, the node and the forced symbols of knowledge, compiled once."""
+    Sentence.validate(knowledge)
+    knowledge = intern(knowledge)
+    if knowledge not in compiled_knowledge:
+        if len(compiled_knowledge) >= CACHE_SIZE:
+            del compiled_knowledge[next(iter(compiled_knowledge))]
+        bdd = BDD(order(knowledge))
+        root = bdd.compile(knowledge)
+        compiled_knowledge[knowledge] = (bdd, root, bdd.forced(root))
+    return compiled_knowledge[knowledge]
+
+
+def model_check(knowledge, query):
+    """Checks if knowledge base entails query."""
+    bdd, root, forced = compile_knowledge(knowledge)
+    # No model, everything is entailed
+    if forced is None:
+        return True
+
+    # Literals are answered by the forced symbols
+    if isinstance(query, Symbol):
+        return forced.get(query.name) is True
+    if isinstance(query, Not) and isinstance(query.operand, Symbol):
+        return forced.get(query.operand.name) is False
+
+    return bdd.apply(IMPLIES, root, bdd.compile(query)) == TRUE
+
+
+def count_models(knowledge, symbols=None):
+    """Returns the number of models of the symbols (the ones of knowledge by default) where knowledge is true."""
+    bdd, root, _ = compile_knowledge(knowledge)
+    return bdd.count(root, knowledge.symbols() if symbols is None else symbols)
@@ -0,0 +1,78 @@
+import math
+import random
+import sys
+import time
+
+import bdd
+import compiled
+import sat
+from generator import generate
+from knowledge import KnowledgeBase
+from logic import model_check
+
+USAGE = "Usage: python benchmark.py [puzzles] [--sizes=characters x statements,...] [--seed=n]"
+SIZES = ((2, 2), (3, 4), (4, 6), (6, 10), (8, 14), (12, 20))
+
+# Solvers of every symbol of a puzzle: a function of the knowledge and the symbols returning the entailed ones,
+# and the largest number of characters it is run on
+BACKENDS = {
+    "logic": (lambda knowledge, symbols: [symbol for symbol in symbols if model_check(knowledge, symbol)], 8),
+    "compiled": (lambda knowledge, symbols: [symbol for symbol in symbols if compiled.model_check(knowledge, symbol)], 10),
+    "sat": (lambda knowledge, symbols: [symbol for symbol in symbols if sat.model_check(knowledge, symbol)], None),
+    "kb-models": (lambda knowledge, symbols: KnowledgeBase(knowledge).entailed(symbols), 10),
+    "kb-sat": (lambda knowledge, symbols: KnowledgeBase(knowledge, backend="sat").entailed(symbols), None),
+    "bdd": (lambda knowledge, symbols: [symbol for symbol in symbols if bdd.model_check(knowledge, symbol)], None),
+}
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    options = dict(arg[2:].split("=", 1) for arg in sys.argv[1:] if arg.startswith("--") and "=" in arg)
+    if len(args) > 1:
+        sys.exit(USAGE)
+    try:
+        count = int(args[0]) if args else 20
+        seed = int(options.get("seed", 0))
+        sizes = SIZES
+        if "sizes" in options:
+            sizes = [tuple(int(n) for n in size.split("x")) for size in options["sizes"].split(",")]
+    except ValueError:
+        sys.exit(USAGE)
+
+    for characters, statements in sizes:
+        rng = random.Random(seed)
+        puzzles = [generate(characters, statements, rng) for _ in range(count)]
+        print(f"{count} puzzles, {characters} characters, {statements} statements")
+
+        answers = None
+        for name, (solve, limit) in BACKENDS.items():
+            if limit is not None and characters > limit:
+                continue
+            latencies, results = run(solve, puzzles)
+            if answers is None:
+                answers = results
+            elif results != answers:
+                raise Exception(f"{name} disagrees with the other backends")
+            print(f"    {name:9}: {len(puzzles) / sum(latencies):10.1f} puzzles/s, "
+                  f"p50 {percentile(latencies, 50) * 1000:9.3f}ms, p95 {percentile(latencies, 95) * 1000:9.3f}ms, "
+                  f"p99 {percentile(latencies, 99) * 1000:9.3f}ms, max {latencies[-1] * 1000:9.3f}ms")
+
+
+def run(solve, puzzles):
+    """Solves the puzzles, returns the sorted latencies and the entailed symbols of each puzzle."""
+    latencies, results = [], []
+    for puzzle in puzzles:
+        start = time.perf_counter()
+        entailed = solve(puzzle.knowledge, puzzle.symbols())
+        latencies.append(time.perf_counter() - start)
+        results.append([symbol.name for symbol in entailed])
+    return (sorted(latencies), results)
+
+
+def percentile(values, p):
+    """Returns the p-th percentile of sorted values (nearest rank)."""
+    return values[max(0, math.ceil(len(values) * p / 100) - 1)]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+from logic import Sentence, Symbol, Not, And, Or, Implication, Biconditional
+
+# Assignments evaluated together, as the bits of one integer (2^CHUNK_SYMBOLS bits)
+CHUNK_SYMBOLS = 16
+
+# Operations of the compiled programs
+LOAD, NOT, AND, OR, IMPLIES, IFF = range(6)
+
+
+class Program():
+    """Flat list of bitwise operations computing a sentence over many models at once."""
+
+    def __init__(self, sentence, symbols=None):
+        Sentence.validate(sentence)
+        self.ops = []
+        self.registers = {}
+        found = set()
+        self.output = self.emit(sentence, found)
+        # Symbol i is true in the models whose index has bit i set
+        self.symbols = sorted(found) if symbols is None else list(symbols)
+        if not found <= set(self.symbols):
+            raise Exception(f"symbols {found - set(self.symbols)} not in the given symbols")
+        index = {name: i for i, name in enumerate(self.symbols)}
+        self.ops = [(LOAD, out, (index[args],)) if op == LOAD else (op, out, args) for op, out, args in self.ops]
+
+    def emit(self, sentence, found):
+        """Appends the operations of sentence, returns the register of its value."""
+        # Equal subformulas are computed once
+        if sentence in self.registers:
+            return self.registers[sentence]
+
+        if isinstance(sentence, Symbol):
+            found.add(sentence.name)
+            op, args = LOAD, sentence.name
+        elif isinstance(sentence, Not):
+            op, args = NOT, (self.emit(sentence.operand, found),)
+        elif isinstance(sentence, And):
+            op, args = AND, tuple(self.emit(conjunct, found) for conjunct in sentence.conjuncts)
+        elif isinstance(sentence, Or):
+            op, args = OR, tuple(self.emit(disjunct, found) for disjunct in sentence.disjuncts)
+        elif isinstance(sentence, Implication):
+            op, args = IMPLIES, (self.emit(sentence.antecedent, found), self.emit(sentence.consequent, found))
+        elif isinstance(sentence, Biconditional):
+            op, args = IFF, (self.emit(sentence.left, found), self.emit(sentence.right, found))
+        else:
+            raise Exception(f"cannot compile {type(sentence).__name__}")
+
+        out = len(self.ops)
+        self.ops.append((op, out, args))
+        self.registers[sentence] = out
+        return out
+
+    def run(self, inputs, mask):
+        """Returns the bits of the models where the sentence is true, given the bits of each symbol."""
+        registers = [0] * len(self.ops)
+        for op, out, args in self.ops:
+            if op == LOAD:
+                value = inputs[args[0]]
+            elif op == NOT:
+                value = mask ^ registers[args[0]]
+            elif op == AND:
+                value = mask
+                for arg in args:
+                    value &= registers[arg]
+            elif op == OR:
+                value = 0
+                for arg in args:
+                    value |= registers[arg]
+            elif op == IMPLIES:
+                value = (mask ^ registers[args[0]]) | registers[args[1]]
+            else:
+                value = mask ^ registers[args[0]] ^ registers[args[1]]
+            registers[out] = value
+        return registers[self.output]
+
+
+def chunks(count):
+    """Yields the number, the inputs and the mask of each chunk of the 2^count models."""
+    size = min(count, CHUNK_SYMBOLS)
+    mask = (1 << (1 << size)) - 1
+
+    # Bits of the symbols changing within a chunk: blocks of 2^i zeros then 2^i ones
+    low = []
+    for i in range(size):
+        block = 1 << i
+        vector = ((1 << block) - 1) << block
+        width = block * 2
+        while width < 1 << size:
+            vector |= vector << width
+            width *= 2
+        low.append(vector)
+
+    # The other symbols are constant within a chunk
+    for chunk in range(1 << (count - size)):
+        high = [mask if chunk >> i & 1 else 0 for i in range(count - size)]
+        yield chunk, low + high, mask
+
+
+def model_check(knowledge, query):
+    """Checks if knowledge base entails query, evaluating the models in chunks of bit vectors."""
+    entailment = Program(Implication(knowledge, query))
+    for _, inputs, mask in chunks(len(entailment.symbols)):
+        if entailment.run(inputs, mask) != mask:
+            return False
+    return True
+
+
+def count_models(knowledge, symbols=None):
+    """Returns the number of models of the symbols (the ones of knowledge by default) where knowledge is true."""
+    program = Program(knowledge, symbols)
+    return sum(program.run(inputs, mask).bit_count() for _, inputs, mask in chunks(len(program.symbols)))
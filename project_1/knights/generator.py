@@ -0,0 +1,71 @@
+import random
+
+from logic import Symbol, And, Or, Not, Biconditional
+from puzzle import Xor
+
+NAMES = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+class Puzzle():
+    """Knights and knaves puzzle: the characters, their symbols, the statements and the knowledge."""
+
+    def __init__(self, characters):
+        if not 1 <= characters <= len(NAMES):
+            raise Exception(f"characters must be between 1 and {len(NAMES)}")
+        self.names = list(NAMES[:characters])
+        self.knights = [Symbol(f"{name} is a Knight") for name in self.names]
+        self.knaves = [Symbol(f"{name} is a Knave") for name in self.names]
+        self.statements = []
+        # Given by definition
+        self.knowledge = And(*[Xor(knight, knave) for knight, knave in zip(self.knights, self.knaves)])
+
+    def symbols(self):
+        """Returns the symbols asked by puzzle.py, in its order."""
+        return [symbol for pair in zip(self.knights, self.knaves) for symbol in pair]
+
+    def say(self, speaker, text, claim):
+        """Adds what speaker says: the claim is true if the speaker is a knight, false if a knave."""
+        self.statements.append(f'{self.names[speaker]} says "{text}"')
+        self.knowledge.add(Biconditional(self.knights[speaker], claim))
+        self.knowledge.add(Biconditional(self.knaves[speaker], Not(claim)))
+
+
+def claims(puzzle, speaker, rng):
+    """Returns a random claim of speaker about the characters: (text, sentence, function of the knights)."""
+    other = rng.randrange(len(puzzle.names))
+    second = rng.randrange(len(puzzle.names))
+    who = "I" if other == speaker else puzzle.names[other]
+    verb = "am" if other == speaker else "is"
+    pair = "We" if speaker in (other, second) and other != second else f"{puzzle.names[other]} and {puzzle.names[second]}"
+    knight, knave = puzzle.knights, puzzle.knaves
+
+    kind = rng.randrange(5 if other != second else 1)
+    if kind == 0:
+        if rng.random() < 0.5:
+            return (f"{who} {verb} a knight.", knight[other], lambda k: k[other])
+        return (f"{who} {verb} a knave.", knave[other], lambda k: not k[other])
+    if kind == 1:
+        return (f"{pair} are both knights.", And(knight[other], knight[second]), lambda k: k[other] and k[second])
+    if kind == 2:
+        return (f"{pair} are both knaves.", And(knave[other], knave[second]), lambda k: not k[other] and not k[second])
+    if kind == 3:
+        return (f"{pair} are the same kind.",
+                Or(And(knight[other], knight[second]), And(knave[other], knave[second])),
+                lambda k: k[other] == k[second])
+    return (f"{pair} are of different kinds.",
+            Or(And(knight[other], knave[second]), And(knave[other], knight[second])),
+            lambda k: k[other] != k[second])
+
+
+def generate(characters, statements, rng=random):
+    """Returns a random puzzle with a solution: the claims are chosen true for the knights of a hidden assignment."""
+    puzzle = Puzzle(characters)
+    solution = [rng.random() < 0.5 for _ in range(characters)]
+    for _ in range(statements):
+        speaker = rng.randrange(characters)
+        while True:
+            text, claim, holds = claims(puzzle, speaker, rng)
+            if holds(solution) == solution[speaker]:
+                break
+        puzzle.say(speaker, text, claim)
+    return puzzle
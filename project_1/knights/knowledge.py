@@ -0,0 +1,106 @@
+import compiled
+import sat
+from logic import Sentence, Symbol, intern
+
+BACKENDS = ("models", "sat")
+
+
+class KnowledgeBase():
+    """Knowledge base answering many queries on the work shared between them.
+
+    The models backend keeps the set of the models satisfying the knowledge as the bits of an integer
+    (2^n bits for n symbols), the sat backend keeps the clauses and the learnt clauses of an incremental solver.
+    """
+
+    def __init__(self, *sentences, backend="models"):
+        if backend not in BACKENDS:
+            raise Exception(f"backend must be one of {', '.join(BACKENDS)}")
+        self.backend = backend
+        self.sentences = []
+        # Answer of each query asked, by interned query
+        self.answers = {}
+        if backend == "models":
+            # Model i assigns symbols[j] the bit j of i, with no symbols there is one (empty) model
+            self.symbols = []
+            self.models = 1
+        else:
+            self.encoder = sat.Encoder()
+        for sentence in sentences:
+            self.tell(sentence)
+
+    def tell(self, sentence):
+        """Adds sentence to the knowledge."""
+        Sentence.validate(sentence)
+        self.sentences.append(sentence)
+        if self.backend == "models":
+            # The vector first, as it can add symbols to the models
+            vector = self.vector(sentence)
+            self.models &= vector
+        else:
+            self.encoder.add(sentence)
+
+        # More knowledge entails at least the same queries, only the negative answers can change
+        self.answers = {query: answer for query, answer in self.answers.items() if answer}
+
+    def ask(self, query):
+        """Checks if the knowledge entails query."""
+        Sentence.validate(query)
+        query = intern(query)
+        if query not in self.answers:
+            if self.backend == "models":
+                vector = self.vector(query)
+                self.answers[query] = (self.models & ~vector) == 0
+            else:
+                self.answers[query] = not self.encoder.solver.solve([-self.encoder.literal(query)])
+        return self.answers[query]
+
+    def entailed(self, queries=None):
+        """Returns the queries (all the symbols by default) entailed by the knowledge, in order."""
+        if queries is None:
+            names = self.symbols if self.backend == "models" else self.encoder.variables
+            queries = [Symbol(name) for name in names]
+        queries = list(queries)
+        if self.backend == "sat":
+            self.solve_all(queries)
+        return [query for query in queries if self.ask(query)]
+
+    def solve_all(self, queries):
+        """Answers the queries with as few solver calls as possible:
+        each model found rules out all the queries false in it."""
+        encoder, solver = self.encoder, self.encoder.solver
+        pending = {}
+        for query in queries:
+            query = intern(query)
+            if query not in self.answers:
+                pending[query] = encoder.literal(query)
+
+        def rule_out():
+            for query, literal in list(pending.items()):
+                if solver.model[abs(literal)] != (literal > 0):
+                    self.answers[query] = False
+                    del pending[query]
+
+        if not solver.solve():
+            self.answers.update(dict.fromkeys(pending, True))
+            return
+        rule_out()
+        while pending:
+            query, literal = next(iter(pending.items()))
+            if solver.solve([-literal]):
+                rule_out()
+            else:
+                self.answers[query] = True
+                del pending[query]
+
+    def vector(self, sentence):
+        """Returns the models where sentence is true as bits, adding its new symbols to the models."""
+        for name in sorted(sentence.symbols() - set(self.symbols)):
+            # The models of the new symbol are the old ones with the symbol false and then true
+            self.models |= self.models << (1 << len(self.symbols))
+            self.symbols.append(name)
+
+        program = compiled.Program(sentence, self.symbols)
+        vector = 0
+        for chunk, inputs, mask in compiled.chunks(len(self.symbols)):
+            vector |= program.run(inputs, mask) << (chunk << compiled.CHUNK_SYMBOLS)
+        return vector
@@ -1,4 +1,5 @@
 import itertools
+import weakref
 
 
 class Sentence():
@@ -7,6 +8,10 @@ class Sentence():
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
 
+    def evaluate_partial(self, model):
+        """Evaluates the logical sentence in a partial model, None if its value depends on the unassigned symbols."""
+        raise Exception("nothing to evaluate")
+
     def formula(self):
         """Returns string formula representing logical sentence."""
         return ""
@@ -62,6 +67,10 @@ class Symbol(Sentence):
         except KeyError:
             raise Exception(f"variable {self.name} not in model")
 
+    def evaluate_partial(self, model):
+        value = model.get(self.name)
+        return None if value is None else bool(value)
+
     def formula(self):
         return self.name
 
@@ -86,6 +95,10 @@ class Not(Sentence):
     def evaluate(self, model):
         return not self.operand.evaluate(model)
 
+    def evaluate_partial(self, model):
+        value = self.operand.evaluate_partial(model)
+        return None if value is None else not value
+
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
@@ -120,6 +133,16 @@ class And(Sentence):
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
 
+    def evaluate_partial(self, model):
+        result = True
+        for conjunct in self.conjuncts:
+            value = conjunct.evaluate_partial(model)
+            if value is False:
+                return False
+            if value is None:
+                result = None
+        return result
+
     def formula(self):
         if len(self.conjuncts) == 1:
             return self.conjuncts[0].formula()
@@ -151,6 +174,16 @@ class Or(Sentence):
     def evaluate(self, model):
         return any(disjunct.evaluate(model) for disjunct in self.disjuncts)
 
+    def evaluate_partial(self, model):
+        result = False
+        for disjunct in self.disjuncts:
+            value = disjunct.evaluate_partial(model)
+            if value is True:
+                return True
+            if value is None:
+                result = None
+        return result
+
     def formula(self):
         if len(self.disjuncts) == 1:
             return self.disjuncts[0].formula()
@@ -183,6 +216,17 @@ class Implication(Sentence):
         return ((not self.antecedent.evaluate(model))
                 or self.consequent.evaluate(model))
 
+    def evaluate_partial(self, model):
+        antecedent = self.antecedent.evaluate_partial(model)
+        if antecedent is False:
+            return True
+        consequent = self.consequent.evaluate_partial(model)
+        if consequent is True:
+            return True
+        if antecedent is None or consequent is None:
+            return None
+        return False
+
     def formula(self):
         antecedent = Sentence.parenthesize(self.antecedent.formula())
         consequent = Sentence.parenthesize(self.consequent.formula())
@@ -216,6 +260,15 @@ class Biconditional(Sentence):
                 or (not self.left.evaluate(model)
                     and not self.right.evaluate(model)))
 
+    def evaluate_partial(self, model):
+        left = self.left.evaluate_partial(model)
+        if left is None:
+            return None
+        right = self.right.evaluate_partial(model)
+        if right is None:
+            return None
+        return left == right
+
     def formula(self):
         left = Sentence.parenthesize(str(self.left))
         right = Sentence.parenthesize(str(self.right))
@@ -225,19 +278,147 @@ class Biconditional(Sentence):
         return set.union(self.left.symbols(), self.right.symbols())
 
 
+class Interned():
+    """Immutable sentence shared by all the structurally equal sentences, built by intern()."""
+
+    frozen = False
+
+    def __setattr__(self, name, value):
+        if self.frozen:
+            raise AttributeError("interned sentences are immutable")
+        super().__setattr__(name, value)
+
+    def freeze(self):
+        """Caches hash, symbols and formula (the operands are interned, so this is linear in their number)."""
+        self.cached_hash = super().__hash__()
+        self.cached_symbols = frozenset(super().symbols())
+        self.cached_formula = super().formula()
+        self.frozen = True
+
+    def __eq__(self, other):
+        # Equal interned sentences are the same object
+        if isinstance(other, Interned):
+            return self is other
+        return super().__eq__(other)
+
+    def __hash__(self):
+        return self.cached_hash
+
+    def symbols(self):
+        return set(self.cached_symbols)
+
+    def formula(self):
+        return self.cached_formula
+
+
+class InternedAnd(Interned, And):
+    def add(self, conjunct):
+        raise AttributeError("interned sentences are immutable")
+
+
+INTERNED_CLASSES = {
+    Symbol: type("InternedSymbol", (Interned, Symbol), {}),
+    Not: type("InternedNot", (Interned, Not), {}),
+    And: InternedAnd,
+    Or: type("InternedOr", (Interned, Or), {}),
+    Implication: type("InternedImplication", (Interned, Implication), {}),
+    Biconditional: type("InternedBiconditional", (Interned, Biconditional), {})
+}
+
+# Unique table of the interned sentences, by class and name or operands.
+# Sentences no longer used are dropped: their parents hold them, so the ids in the keys stay valid.
+interned = weakref.WeakValueDictionary()
+
+
+def intern(sentence):
+    """Returns the interned sentence structurally equal to sentence."""
+    if isinstance(sentence, Interned):
+        return sentence
+
+    if isinstance(sentence, Symbol):
+        cls, args = Symbol, (sentence.name,)
+    elif isinstance(sentence, Not):
+        cls, args = Not, (intern(sentence.operand),)
+    elif isinstance(sentence, And):
+        cls, args = And, tuple(intern(conjunct) for conjunct in sentence.conjuncts)
+    elif isinstance(sentence, Or):
+        cls, args = Or, tuple(intern(disjunct) for disjunct in sentence.disjuncts)
+    elif isinstance(sentence, Implication):
+        cls, args = Implication, (intern(sentence.antecedent), intern(sentence.consequent))
+    elif isinstance(sentence, Biconditional):
+        cls, args = Biconditional, (intern(sentence.left), intern(sentence.right))
+    else:
+        raise TypeError("must be a logical sentence")
+
+    # The operands are unique, their identity identifies them
+    key = (cls, args) if cls is Symbol else (cls, tuple(id(arg) for arg in args))
+    node = interned.get(key)
+    if node is None:
+        node = INTERNED_CLASSES[cls](*args)
+        node.freeze()
+        interned[key] = node
+    return node
+
+
 def model_check(knowledge, query):
     """Checks if knowledge base entails query."""
 
+    def conjuncts(sentence):
+        """Yields the conjuncts of sentence, flattening the nested conjunctions."""
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                yield from conjuncts(conjunct)
+        else:
+            yield sentence
+
+    # Conjuncts of the knowledge base with their symbols, for the unit propagation
+    units = [(conjunct, conjunct.symbols()) for conjunct in conjuncts(knowledge)]
+
+    def propagate(model):
+        """Assigns the symbols forced by the conjuncts with one unassigned symbol,
+        returns False if a conjunct is false whatever its value."""
+        changed = True
+        while changed:
+            changed = False
+            for conjunct, symbols in units:
+                unassigned = [symbol for symbol in symbols if symbol not in model]
+                if len(unassigned) != 1 or conjunct.evaluate_partial(model) is not None:
+                    continue
+                p = unassigned[0]
+                model[p] = True
+                when_true = conjunct.evaluate_partial(model)
+                model[p] = False
+                when_false = conjunct.evaluate_partial(model)
+                del model[p]
+                if when_true is False and when_false is False:
+                    return False
+                if when_true is False or when_false is False:
+                    model[p] = when_false is False
+                    changed = True
+        return True
+
     def check_all(knowledge, query, symbols, model):
-        """Checks if knowledge base entails query, given a particular model."""
+        """Checks if knowledge base entails query, given a particular (partial) model."""
 
-        # If model has an assignment for each symbol
-        if not symbols:
+        # Symbols whose other value makes the knowledge base false
+        if not propagate(model):
+            return True
+        symbols = symbols - model.keys()
+
+        # If knowledge base is false in every model extending this one, there is nothing to check
+        knowledge_value = knowledge.evaluate_partial(model)
+        if knowledge_value is False:
+            return True
 
-            # If knowledge base is true in model, then query must also be true
-            if knowledge.evaluate(model):
-                return query.evaluate(model)
+        # If query is true in every model extending this one, entailment holds
+        query_value = query.evaluate_partial(model)
+        if query_value is True:
             return True
+
+        # If knowledge base is true in every model extending this one, then query must also be true
+        # (the values of both are known once every symbol is assigned)
+        if knowledge_value is True and query_value is False:
+            return False
         else:
 
             # Choose one of the remaining unused symbols
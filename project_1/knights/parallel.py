@@ -0,0 +1,101 @@
+import math
+import multiprocessing
+import os
+import sys
+import time
+
+import compiled
+from logic import Symbol, And, Implication, model_check as tree_model_check
+
+# Shards for each worker, so that the faster workers take more of them
+SHARDS_PER_WORKER = 8
+# Largest number of symbols benchmarked with the recursive model_check of logic.py
+TREE_LIMIT = 16
+
+USAGE = "Usage: python parallel.py [min_symbols max_symbols] [--workers=n]"
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--workers=")]
+    workers = [arg for arg in sys.argv[1:] if arg.startswith("--workers=")]
+    if len(args) not in (0, 2):
+        sys.exit(USAGE)
+    try:
+        low, high = (int(args[0]), int(args[1])) if args else (10, 26)
+        workers = int(workers[-1].split("=", 1)[1]) if workers else os.cpu_count()
+    except ValueError:
+        sys.exit(USAGE)
+
+    print(f"{workers} workers, time of an entailment (every model checked) plus a non-entailment (stops early), parallel includes the pool start")
+    for count in range(low, high + 1, 2):
+        # A chain of implications: every model is checked for the entailment of its ends,
+        # the model with all symbols false is a counter-model of the last symbol
+        symbols = [Symbol(f"p{i}") for i in range(count)]
+        knowledge = And(*[Implication(symbols[i], symbols[i + 1]) for i in range(count - 1)])
+        entailed = Implication(symbols[0], symbols[-1])
+        not_entailed = symbols[-1]
+
+        timings = []
+        for check in (compiled.model_check, lambda k, q: model_check(k, q, workers)):
+            start = time.perf_counter()
+            if not check(knowledge, entailed) or check(knowledge, not_entailed):
+                raise Exception("wrong answer")
+            timings.append(time.perf_counter() - start)
+        line = f"n={count:2}: compiled {timings[0]:.3f}s, parallel {timings[1]:.3f}s"
+        if count <= TREE_LIMIT:
+            start = time.perf_counter()
+            tree_model_check(knowledge, entailed)
+            line += f", logic.model_check {time.perf_counter() - start:.3f}s"
+        print(line)
+
+
+def model_check(knowledge, query, workers=None, shard_symbols=None):
+    """Checks if knowledge base entails query, enumerating the models in shards on a pool of processes."""
+    entailment = Implication(knowledge, query)
+    symbols = sorted(entailment.symbols())
+    workers = workers or os.cpu_count()
+    if shard_symbols is None:
+        shard_symbols = math.ceil(math.log2(workers * SHARDS_PER_WORKER))
+    shard_symbols = min(shard_symbols, len(symbols))
+
+    # The first symbols are fixed in each shard, the others enumerated
+    fixed, free = symbols[:shard_symbols], symbols[shard_symbols:]
+    found = multiprocessing.Event()
+    initargs = (entailment, free + fixed, len(fixed), found)
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=initargs) as pool:
+        for holds in pool.imap_unordered(_check_shard, range(1 << len(fixed))):
+            if not holds:
+                # Stops the shards still running
+                found.set()
+                return False
+    return True
+
+
+# State of the worker processes
+worker_program = None
+worker_fixed = None
+worker_found = None
+
+
+def _init_worker(entailment, symbols, fixed, found):
+    global worker_program, worker_fixed, worker_found
+    worker_program = compiled.Program(entailment, symbols)
+    worker_fixed = fixed
+    worker_found = found
+
+
+def _check_shard(shard):
+    """Checks the models of a shard, the values of its fixed symbols (the last ones of the program) are the bits of shard."""
+    free = len(worker_program.symbols) - worker_fixed
+    for _, inputs, mask in compiled.chunks(free):
+        # Another shard has a counter-model, the answer is known
+        if worker_found.is_set():
+            return True
+        fixed = [mask if shard >> i & 1 else 0 for i in range(worker_fixed)]
+        if worker_program.run(inputs + fixed, mask) != mask:
+            return False
+    return True
+
+
+if __name__ == "__main__":
+    main()
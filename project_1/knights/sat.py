@@ -0,0 +1,325 @@
+from logic import Symbol, Not, And, Or, Implication, Biconditional, intern
+
+# Conflicts before the first restart, the following ones are spaced by the Luby sequence
+RESTART_BASE = 100
+ACTIVITY_DECAY = 0.95
+
+
+class Solver():
+    """CDCL SAT solver with two watched literals per clause, first UIP clause learning and restarts.
+
+    Variables are positive integers, literals are variables (true) or their negation (false).
+    Clauses can be added between the calls to solve, and the learnt clauses are kept.
+    """
+
+    def __init__(self):
+        self.count = 0
+        # By variable (index 0 unused): value (None if unassigned), decision level, reason clause, activity, last value
+        self.values = [None]
+        self.levels = [0]
+        self.reasons = [None]
+        self.activity = [0.0]
+        self.phases = [False]
+        # Value of each assigned literal (both signs)
+        self.truth = {}
+        # Clauses watching each literal
+        self.watches = {}
+        self.trail = []
+        self.trail_limits = []
+        self.head = 0
+        self.increment = 1.0
+        self.ok = True
+        self.model = None
+
+    def new_variable(self):
+        self.count += 1
+        self.values.append(None)
+        self.levels.append(0)
+        self.reasons.append(None)
+        self.activity.append(0.0)
+        self.phases.append(False)
+        self.watches[self.count] = []
+        self.watches[-self.count] = []
+        return self.count
+
+    def value(self, literal):
+        """Returns the value of literal, None if unassigned."""
+        return self.truth.get(literal)
+
+    def add_clause(self, literals):
+        """Adds the clause (a disjunction of literals), returns False if the clauses are now unsatisfiable."""
+        if not self.ok:
+            return False
+        self.backtrack(0)
+
+        clause = []
+        for literal in literals:
+            value = self.value(literal)
+            if value is True or -literal in clause:
+                return True
+            if value is None and literal not in clause:
+                clause.append(literal)
+
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self.assign(clause[0], None)
+            self.ok = self.propagate() is None
+        else:
+            self.watches[clause[0]].append(clause)
+            self.watches[clause[1]].append(clause)
+        return self.ok
+
+    def assign(self, literal, reason):
+        variable = abs(literal)
+        self.values[variable] = literal > 0
+        self.truth[literal] = True
+        self.truth[-literal] = False
+        self.levels[variable] = len(self.trail_limits)
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def backtrack(self, level):
+        """Unassigns the variables of the decision levels above level."""
+        if len(self.trail_limits) <= level:
+            return
+        start = self.trail_limits[level]
+        for literal in self.trail[start:]:
+            variable = abs(literal)
+            self.phases[variable] = self.values[variable]
+            self.values[variable] = None
+            del self.truth[literal], self.truth[-literal]
+            self.reasons[variable] = None
+        del self.trail[start:]
+        del self.trail_limits[level:]
+        self.head = min(self.head, start)
+
+    def propagate(self):
+        """Assigns the literals implied by unit clauses, returns a conflicting clause or None."""
+        truth = self.truth
+        while self.head < len(self.trail):
+            false_literal = -self.trail[self.head]
+            self.head += 1
+            watching = self.watches[false_literal]
+            self.watches[false_literal] = kept = []
+
+            for index, clause in enumerate(watching):
+                # The watched literals are the first two, the false one goes second
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+                other = clause[0]
+                if truth.get(other) is True:
+                    kept.append(clause)
+                    continue
+
+                # Looks for another literal not false to watch
+                for k in range(2, len(clause)):
+                    if truth.get(clause[k]) is not False:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches[clause[1]].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if truth.get(other) is False:
+                        kept.extend(watching[index + 1:])
+                        return clause
+                    self.assign(other, clause)
+        return None
+
+    def analyze(self, conflict):
+        """Returns the first UIP clause learnt from the conflict, asserting literal first, and its backjump level."""
+        level = len(self.trail_limits)
+        learnt = [None]
+        seen = set()
+        pending = 0
+        index = len(self.trail) - 1
+        clause, literal = conflict, None
+
+        while True:
+            for other in (clause if literal is None else clause[1:]):
+                variable = abs(other)
+                if variable not in seen and self.levels[variable] > 0:
+                    seen.add(variable)
+                    self.bump(variable)
+                    if self.levels[variable] == level:
+                        pending += 1
+                    else:
+                        learnt.append(other)
+
+            # Latest assignment of this level involved in the conflict
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            seen.discard(abs(literal))
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.reasons[abs(literal)]
+
+        learnt[0] = -literal
+        if len(learnt) == 1:
+            return (learnt, 0)
+        # The deepest of the other literals is watched with the asserting one
+        deepest = max(range(1, len(learnt)), key=lambda i: self.levels[abs(learnt[i])])
+        learnt[1], learnt[deepest] = learnt[deepest], learnt[1]
+        return (learnt, self.levels[abs(learnt[1])])
+
+    def bump(self, variable):
+        self.activity[variable] += self.increment
+        if self.activity[variable] > 1e100:
+            self.activity = [activity * 1e-100 for activity in self.activity]
+            self.increment *= 1e-100
+
+    def decide(self):
+        """Returns the unassigned variable with the highest activity, None if all are assigned."""
+        best, best_activity = None, -1.0
+        for variable in range(1, self.count + 1):
+            if self.values[variable] is None and self.activity[variable] > best_activity:
+                best, best_activity = variable, self.activity[variable]
+        return best
+
+    def solve(self, assumptions=()):
+        """Returns True if the clauses and the assumed literals are satisfiable, keeping a model in self.model."""
+        self.model = None
+        if not self.ok:
+            return False
+        self.backtrack(0)
+        if self.propagate() is not None:
+            self.ok = False
+            return False
+
+        conflicts = 0
+        restarts = 0
+        limit = RESTART_BASE * luby(restarts)
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                if not self.trail_limits:
+                    self.ok = False
+                    return False
+                learnt, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learnt) == 1:
+                    self.assign(learnt[0], None)
+                else:
+                    self.watches[learnt[0]].append(learnt)
+                    self.watches[learnt[1]].append(learnt)
+                    self.assign(learnt[0], learnt)
+                self.increment /= ACTIVITY_DECAY
+                conflicts += 1
+                continue
+
+            if conflicts >= limit:
+                self.backtrack(0)
+                conflicts = 0
+                restarts += 1
+                limit = RESTART_BASE * luby(restarts)
+                continue
+
+            # The assumptions are the first decisions
+            level = len(self.trail_limits)
+            if level < len(assumptions):
+                literal = assumptions[level]
+                value = self.value(literal)
+                if value is False:
+                    self.backtrack(0)
+                    return False
+                self.trail_limits.append(len(self.trail))
+                if value is None:
+                    self.assign(literal, None)
+                continue
+
+            variable = self.decide()
+            if variable is None:
+                self.model = list(self.values)
+                self.backtrack(0)
+                return True
+            self.trail_limits.append(len(self.trail))
+            self.assign(variable if self.phases[variable] else -variable, None)
+
+
+def luby(i):
+    """Returns the i-th term (from 0) of the Luby sequence 1, 1, 2, 1, 1, 2, 4, ..."""
+    size, exponent = 1, 0
+    while size < i + 1:
+        exponent += 1
+        size = 2 * size + 1
+    while size - 1 != i:
+        size = (size - 1) // 2
+        exponent -= 1
+        i %= size
+    return 1 << exponent
+
+
+class Encoder():
+    """Tseitin encoding of sentences into the clauses of a solver, a variable for each distinct subformula."""
+
+    def __init__(self, solver=None):
+        self.solver = Solver() if solver is None else solver
+        self.variables = {}
+        self.literals = {}
+
+    def variable(self, name):
+        """Returns the variable of a symbol."""
+        if name not in self.variables:
+            self.variables[name] = self.solver.new_variable()
+        return self.variables[name]
+
+    def literal(self, sentence):
+        """Returns a literal equivalent to sentence, adding the clauses defining it."""
+        sentence = intern(sentence)
+        if sentence in self.literals:
+            return self.literals[sentence]
+
+        if isinstance(sentence, Symbol):
+            literal = self.variable(sentence.name)
+        elif isinstance(sentence, Not):
+            literal = -self.literal(sentence.operand)
+        elif isinstance(sentence, (And, Or, Implication)):
+            if isinstance(sentence, And):
+                operands = [-self.literal(conjunct) for conjunct in sentence.conjuncts]
+            elif isinstance(sentence, Or):
+                operands = [self.literal(disjunct) for disjunct in sentence.disjuncts]
+            else:
+                operands = [-self.literal(sentence.antecedent), self.literal(sentence.consequent)]
+            # And is encoded as the negation of the disjunction of the negated conjuncts
+            literal = self.solver.new_variable()
+            for operand in operands:
+                self.solver.add_clause([literal, -operand])
+            self.solver.add_clause([-literal] + operands)
+            if isinstance(sentence, And):
+                literal = -literal
+        elif isinstance(sentence, Biconditional):
+            left, right = self.literal(sentence.left), self.literal(sentence.right)
+            literal = self.solver.new_variable()
+            self.solver.add_clause([-literal, -left, right])
+            self.solver.add_clause([-literal, left, -right])
+            self.solver.add_clause([literal, left, right])
+            self.solver.add_clause([literal, -left, -right])
+        else:
+            raise TypeError("must be a logical sentence")
+
+        self.literals[sentence] = literal
+        return literal
+
+    def add(self, sentence):
+        """Adds sentence as a fact, returns False if the facts are now unsatisfiable."""
+        sentence = intern(sentence)
+        # Facts at the top need no variable of their own
+        if isinstance(sentence, And):
+            return all([self.add(conjunct) for conjunct in sentence.conjuncts])
+        if isinstance(sentence, Or):
+            return self.solver.add_clause([self.literal(disjunct) for disjunct in sentence.disjuncts])
+        return self.solver.add_clause([self.literal(sentence)])
+
+    def model(self):
+        """Returns the values of the symbols in the last model found."""
+        return {name: self.solver.model[variable] for name, variable in self.variables.items()}
+
+
+def model_check(knowledge, query):
+    """Checks if knowledge base entails query, as knowledge ∧ ¬query being unsatisfiable."""
+    encoder = Encoder()
+    encoder.add(knowledge)
+    return not encoder.solver.solve([-encoder.literal(query)])